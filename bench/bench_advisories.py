@@ -0,0 +1,205 @@
+"""Nested-loop vs indexed evaluation of the warning JSON.
+
+    python bench/bench_advisories.py --repeat 200
+
+nested_advisories() is the get_advisories() body before the WarningIndex
+refactor. It also counted active 乾燥注意報 local areas as land wind, so the two
+results differ when a dry advisory is in force without sea-only wind names (see
+the derived "dry only" case); both results are printed.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import fixtures
+from main import evaluate_advisories
+from warning_index import WarningIndex, DRY_CODE, WIND_CODES
+
+AREA_CODE = "4010000"
+
+
+def nested_advisories(data):
+    is_dry = False
+    is_strong_wind_land = False
+    wind_locations = []
+    
+    # 海上エリアのコード (響灘: 4010001, 瀬戸内側: 4010002)
+    SEA_AREA_CODES = ["4010001", "4010002"]
+
+    try:
+        
+        # 1. Check Top-Level AreaTypes (Most reliable for "Issued" status)
+        # 4010000 is Kitakyushu Region
+        if 'areaTypes' in data:
+            for at in data['areaTypes']:
+                for a in at.get('areas', []):
+                    if a.get('code') == AREA_CODE:
+                        for w in a.get('warnings', []):
+                            code = w.get('code')
+                            status = w.get('status')
+                            
+                            # 乾燥注意報 (21)
+                            if code == '21' and status in ['発表', '継続']:
+                                is_dry = True
+                            
+                            # 強風注意報 (15, 06, or 04 depending on context)
+                            if code in ['06', '15', '04'] and status in ['発表', '継続']:
+                                # Flag as potentially active. We will refine by land/sea/location below or defaults to True 
+                                # if we can't determine specific locations.
+                                # Defaulting to True here to ensure it's not missed.
+                                is_strong_wind_land = True 
+
+        # 2. Detailed location check from timeSeries
+        # This helps identify if it is "Hibikinada" (Sea) vs "Kitakyushu City" (Land)
+        found_land_wind_in_ts = False
+        found_sea_wind_in_ts = False
+        
+        # Keywords to identify Sea areas by Name
+        sea_keywords = ["響灘", "瀬戸内", "周防灘", "海上"]
+
+        if 'timeSeries' in data:
+            for ts in data['timeSeries']:
+                for at in ts.get('areaTypes', []):
+                    for a in at.get('areas', []):
+                        if a.get('code') == AREA_CODE:
+                            for w in a.get('warnings', []):
+                                code = w.get('code')
+                                if code in ['06', '15', '04', '21']:
+                                    for level in w.get('levels', []):
+                                        for la in level.get('localAreas', []):
+                                            vals = la.get('values', [])
+                                            is_active_loc = False
+                                            for v in vals:
+                                                if v and v >= "10": 
+                                                    is_active_loc = True
+                                                    break
+                                            
+                                            if is_active_loc:
+                                                if code == '21':
+                                                    is_dry = True
+                                                
+                                                loc_code = la.get('localAreaCode')
+                                                loc_name = la.get('localAreaName', '')
+                                                if loc_name:
+                                                    wind_locations.append(loc_name)
+                                                
+                                                # Check Code first
+                                                is_sea_by_code = (loc_code and loc_code in SEA_AREA_CODES)
+                                                # Check Name
+                                                is_sea_by_name = any(k in loc_name for k in sea_keywords)
+
+                                                if is_sea_by_code or is_sea_by_name:
+                                                    found_sea_wind_in_ts = True
+                                                else:
+                                                    found_land_wind_in_ts = True
+
+        # Refine is_strong_wind_land based on details
+        if found_land_wind_in_ts or found_sea_wind_in_ts:
+            # If we found specific sub-area info, use it
+            is_strong_wind_land = found_land_wind_in_ts
+        elif is_strong_wind_land:
+            pass
+
+        # 3. Fallback/Confirmation via Headline
+        headline = data.get('headlineText', '')
+        if not is_strong_wind_land:
+            if ("強風" in headline or "暴風" in headline) and "北九州" in headline:
+                if ("響灘" in headline or "瀬戸内" in headline or "海上" in headline) and "北九州市" not in headline and "陸上" not in headline:
+                     pass # Likely Sea only
+                else:
+                     is_strong_wind_land = True
+        
+        if not is_dry:
+            if "乾燥" in headline and "北九州" in headline:
+                is_dry = True
+        
+        is_wind_issued = is_strong_wind_land or (len(wind_locations) > 0)
+        
+        # Verify based on collected location names (Double Check)
+        if wind_locations:
+            all_sea = True
+            for loc in wind_locations:
+                if not any(k in loc for k in sea_keywords):
+                    all_sea = False
+                    break
+            
+            if all_sea:
+                is_strong_wind_land = False
+        else:
+             # If no locations found but is_strong_wind_land is True, check headline for exclusive sea
+             if is_strong_wind_land:
+                  if (("海上" in headline or "響灘" in headline or "瀬戸内" in headline) 
+                      and "陸上" not in headline 
+                      and "北九州市" not in headline):
+                       is_strong_wind_land = False
+                       # Also implies is_wind_issued should theoretically be True still (it is issued, just for Sea)
+                       is_wind_issued = True
+
+        wind_locations = sorted(list(set(wind_locations)))
+
+    except Exception as e:
+        print(f"Error checking advisories: {e}")
+        # Default safely
+        is_wind_issued = False
+        is_strong_wind_land = False # Ensure this is also reset on error
+        
+    return is_dry, is_wind_issued, is_strong_wind_land, wind_locations
+
+
+def median_time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def load_fixtures():
+    with open(os.path.join(fixtures.ROOT, 'warning_full_utf8.json'), encoding='utf-8') as f:
+        yield 'warning_full_utf8.json', json.load(f)
+    data = json.loads(fixtures.warning_json())
+    yield 'debug_output_utf8.json', data
+    yield 'dry only (derived)', dry_only(data)
+
+
+def dry_only(data):
+    """debug_output_utf8.json with every warning except 乾燥注意報 removed."""
+    data = json.loads(json.dumps(data))
+    data['headlineText'] = ''
+    for at in data['areaTypes']:
+        for a in at['areas']:
+            a['warnings'] = [w for w in a.get('warnings', []) if w.get('code') == DRY_CODE]
+    for ts in data['timeSeries']:
+        for at in ts['areaTypes']:
+            for a in at['areas']:
+                a['warnings'] = [w for w in a.get('warnings', []) if w.get('code') == DRY_CODE]
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<26}{'nested us':>10}{'indexed us':>11}{'build us':>10}{'lookup us':>10}")
+    for name, data in load_fixtures():
+        index = WarningIndex(data)
+        lookups = lambda: (index.has_active(AREA_CODE, WIND_CODES), index.active_local_areas(AREA_CODE, WIND_CODES),
+                           index.active_local_areas(AREA_CODE, [DRY_CODE]))
+        t_old = median_time(lambda: nested_advisories(data), args.repeat)
+        t_new = median_time(lambda: evaluate_advisories(data), args.repeat)
+        t_build = median_time(lambda: WarningIndex(data), args.repeat)
+        t_lookup = median_time(lookups, args.repeat)
+        print(f"{name:<26}{t_old * 1e6:>10.0f}{t_new * 1e6:>11.0f}{t_build * 1e6:>10.0f}{t_lookup * 1e6:>10.1f}")
+        print(f"  nested : {nested_advisories(data)}")
+        print(f"  indexed: {evaluate_advisories(data)}")
+
+
+if __name__ == "__main__":
+    main()
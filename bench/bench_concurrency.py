@@ -0,0 +1,66 @@
+"""Sequential vs concurrent end-to-end fetch latency against a local stand-in server.
+
+    python bench/bench_concurrency.py --latency 0.3 --repeat 3
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import main as jma
+from jma_stub import JMAStubServer
+
+
+class NoCache:
+    """Keeps the month cache out of the way so every run hits the server."""
+
+    def get(self, *args, **kwargs):
+        return None
+
+    def put(self, *args, **kwargs):
+        pass
+
+
+def point_at(base_url):
+    jma.set_base_url(base_url)
+    jma.PRECIP_CACHE = NoCache()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds added to every response')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Month boundary case: early-month runs need two daily_a1 pages
+    boundary = [datetime.date(2026, 2, 1), datetime.date(2026, 1, 31), datetime.date(2026, 1, 30)]
+
+    with JMAStubServer(latency=args.latency) as server:
+        point_at(server.base_url)
+        rows = [
+            ("fetch_inputs", lambda c: jma.fetch_inputs(concurrent=c)),
+            ("fetch_precip_from_jma (2 months)", lambda c: jma.fetch_precip_from_jma(boundary, '82', '0780', 'a1', concurrent=c)),
+        ]
+        print(f"latency per request: {args.latency:.2f}s, median of {args.repeat}")
+        print(f"{'stage':<36}{'sequential':>12}{'concurrent':>12}{'speedup':>10}")
+        for name, fn in rows:
+            seq = timed(lambda: fn(False), args.repeat)
+            con = timed(lambda: fn(True), args.repeat)
+            print(f"{name:<36}{seq:>11.3f}s{con:>11.3f}s{seq / con:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""BeautifulSoup vs streaming extraction of daily_a1/daily_s1 precipitation.
+
+    python bench/bench_daily_table.py --repeat 50
+"""
+import argparse
+import calendar
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from bs4 import BeautifulSoup
+
+import fixtures
+from daily_table import extract_daily_precip, CHUNK_SIZE
+
+
+def bs4_extract(raw, page_type):
+    """The full-DOM path fetch_precip_from_jma used before the streaming extractor."""
+    month_map = {}
+    soup = BeautifulSoup(raw.decode('shift_jis', errors='replace'), 'html.parser')
+    for row in soup.find_all('tr', class_='mtx'):
+        cols = row.find_all('td')
+        if not cols: continue
+        d_text = cols[0].text.strip()
+        if not d_text.isdigit(): continue
+        val = 0.0
+        col_idx = 1 if page_type == 'a1' else 3
+        if len(cols) > col_idx:
+            d_val_text = cols[col_idx].text.strip()
+            if d_val_text in ["--", "///", "0.0)"]:
+                val = 0.0
+            else:
+                clean = re.sub(r'[^\d\.]', '', d_val_text)
+                if clean: val = float(clean)
+        month_map[int(d_text)] = val
+    return month_map
+
+
+def chunks(raw):
+    for i in range(0, len(raw), CHUNK_SIZE):
+        yield raw[i:i + CHUNK_SIZE]
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'page':<34}{'path':<22}{'median ms':>10}{'peak KiB':>10}")
+    for page_type, block_no, year, month, last_day in fixtures.SAVED_PAGES:
+        raw = fixtures.load_saved_page(page_type, block_no, year, month)
+        end = last_day or calendar.monthrange(year, month)[1]
+        # A morning run wants yesterday and the two days before it
+        days = [end - 2, end - 1, end]
+
+        expected = {d: v for d, v in bs4_extract(raw, page_type).items() if d in days}
+        assert extract_daily_precip(chunks(raw), page_type, days) == expected
+
+        paths = [
+            ("bs4 full DOM", lambda: bs4_extract(raw, page_type)),
+            ("stream, all days", lambda: extract_daily_precip(chunks(raw), page_type)),
+            ("stream, 3 days", lambda: extract_daily_precip(chunks(raw), page_type, days)),
+        ]
+        name = os.path.basename(fixtures.saved_page_path(page_type, block_no, year, month))
+        for label, fn in paths:
+            t, peak = measure(fn, args.repeat)
+            print(f"{name:<34}{label:<22}{t * 1000:>10.2f}{peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Full json.loads vs selective parse of the prefectural warning document.
+
+    python bench/bench_warning_parse.py --repeat 50
+
+The live file is served without indentation, so each fixture is measured both
+as saved (indented) and re-serialized compactly. "x10 areas" repeats every area
+ten times under fresh codes to stand in for a larger office file.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import fixtures
+from warning_stream import parse_warning_subset
+
+AREA_CODE = "4010000"
+
+
+def scaled(data, factor):
+    data = json.loads(json.dumps(data))
+
+    def grow(areas):
+        out = list(areas)
+        for i in range(1, factor):
+            for a in areas:
+                copy = json.loads(json.dumps(a))
+                copy['code'] = str(int(a['code']) + i * 10000000)
+                out.append(copy)
+        return out
+
+    for at in data['areaTypes']:
+        at['areas'] = grow(at['areas'])
+    for ts in data['timeSeries']:
+        for at in ts['areaTypes']:
+            at['areas'] = grow(at['areas'])
+    return data
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def documents():
+    for name in ('warning_full_utf8.json', 'debug_output_utf8.json'):
+        with open(os.path.join(fixtures.ROOT, name), encoding='utf-8') as f:
+            text = f.read()
+        data = json.loads(text)
+        yield name, text
+        yield name + ' compact', json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    data = json.loads(fixtures.warning_json())
+    yield 'debug_output x10 areas', json.dumps(scaled(data, 10), ensure_ascii=False, separators=(',', ':'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'document':<36}{'KiB':>6}{'loads ms':>10}{'subset ms':>10}{'loads peak':>12}{'subset peak':>12}")
+    for name, text in documents():
+        full = json.loads(text)
+        subset = parse_warning_subset(text, [AREA_CODE])
+        assert subset['headlineText'] == full['headlineText']
+        t_full, p_full = measure(lambda: json.loads(text), args.repeat)
+        t_sub, p_sub = measure(lambda: parse_warning_subset(text, [AREA_CODE]), args.repeat)
+        print(f"{name:<36}{len(text.encode('utf-8')) // 1024:>6}{t_full * 1000:>10.2f}{t_sub * 1000:>10.2f}"
+              f"{p_full // 1024:>10}Ki{p_sub // 1024:>10}Ki")
+
+
+if __name__ == "__main__":
+    main()
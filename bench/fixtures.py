@@ -0,0 +1,135 @@
+"""Synthetic JMA pages for the offline benchmarks.
+
+The daily_a1/daily_s1 and pre00.html layouts follow the live pages closely
+enough for the scrapers in src/main.py: one ``tr.mtx`` row per day with the
+day number in the first cell, and one row per station in pre00.html.
+"""
+import ast
+import calendar
+import os
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WARNING_FIXTURE = os.path.join(ROOT, "debug_output_utf8.json")
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+# Saved month pages used by the parser benchmarks: (page_type, block_no, year, month, last_day)
+SAVED_PAGES = [
+    ('a1', '0780', 2026, 1, None),
+    ('a1', '0780', 2026, 2, 16),
+    ('s1', '47807', 2026, 1, None),
+]
+
+# daily_a1 columns after the day: precip total, max 1h, max 10min, temp avg/max/min,
+# humidity avg/min, wind avg, max wind+dir, gust+dir, most frequent dir, sunshine, snow
+A1_COLUMNS = 19
+# daily_s1 columns after the day: pressure (local, sea), precip total, ...
+S1_COLUMNS = 30
+
+
+def precip_values(year, month, seed=None):
+    rnd = random.Random(seed if seed is not None else year * 100 + month)
+    days = calendar.monthrange(year, month)[1]
+    vals = []
+    for _ in range(days):
+        r = rnd.random()
+        if r < 0.55:
+            vals.append("--")
+        elif r < 0.65:
+            vals.append("0.0")
+        elif r < 0.7:
+            vals.append(f"{rnd.uniform(0.5, 5):.1f})")
+        else:
+            vals.append(f"{rnd.uniform(0.5, 60):.1f}")
+    return vals
+
+
+def daily_page(page_type, year, month, values=None, last_day=None):
+    """Returns a shift_jis encoded month page. Rows after last_day are left blank."""
+    values = values or precip_values(year, month)
+    precip_idx = 1 if page_type == 'a1' else 3
+    n_cols = A1_COLUMNS if page_type == 'a1' else S1_COLUMNS
+    parts = [
+        "<html><head><meta http-equiv='Content-Type' content='text/html; charset=Shift_JIS'>",
+        f"<title>気象庁|過去の気象データ検索 {year}年{month}月</title></head><body>",
+        "<div id='main'><table id='tablefix1' class='data2_s'>",
+        "<tr class='mtx'><th rowspan='2' scope='col'>日</th><th colspan='3' scope='colgroup'>降水量(mm)</th>"
+        "<th colspan='3' scope='colgroup'>気温(℃)</th></tr>",
+        "<tr class='mtx'>" + "".join(f"<th scope='col'>項目{i}</th>" for i in range(n_cols)) + "</tr>",
+    ]
+    for day, val in enumerate(values, start=1):
+        cells = [f"<td style='white-space:nowrap'><div class='a_print'><a href='hourly_{page_type}.php?day={day}'>{day}</a></div></td>"]
+        for col in range(1, n_cols + 1):
+            if last_day is not None and day > last_day:
+                text = ""
+            elif col == precip_idx:
+                text = val
+            else:
+                text = f"{(day * 7 + col * 3) % 40 / 2:.1f}"
+            cells.append(f"<td class='data_0_0'>{text}</td>")
+        parts.append("<tr class='mtx' style='text-align:right;'>" + "".join(cells) + "</tr>")
+    parts.append("</table></div>")
+    parts.append("<div id='footer'>" + "<p>注記</p>" * 200 + "</div></body></html>")
+    return "\n".join(parts).encode('shift_jis')
+
+
+def pre00_page(stations=None, prefectures=47):
+    """Returns a pre00.html-like table with 八幡 listed under 福岡県."""
+    stations = stations or [("福岡県", "八幡", ["4.0", "(13)", "5.0", "(9)", "25.5", "(34)", "35.5", "(31)"])]
+    rows = ["<html><head><meta charset='utf-8'><title>全国の天候</title></head><body><table>"]
+    rows.append("<tr><th>都道府県</th><th>地点</th><th>前10日</th><th>平年比</th><th>前20日</th><th>平年比</th><th>前30日</th><th>平年比</th></tr>")
+    for p in range(prefectures):
+        for s in range(12):
+            pref = f"県{p}" if s == 0 else ""
+            rows.append(f"<tr><td>{pref}</td><td>地点{p}-{s}</td>" + "<td>1.0</td><td>(10)</td>" * 4 + "</tr>")
+    for pref, name, vals in stations:
+        rows.append(f"<tr><td>{pref}</td><td>{name}</td>" + "".join(f"<td>{v}</td>" for v in vals) + "</tr>")
+    rows.append("</table></body></html>")
+    return "\n".join(rows).encode('utf-8')
+
+
+def recorded_pre00_rows(path=os.path.join(ROOT, "fukuoka_rows.txt")):
+    """Station rows recorded from the live pre00.html (UTF-16, one Python list per line)."""
+    with open(path, encoding='utf-16') as f:
+        lines = [ast.literal_eval(line) for line in f if line.strip()]
+    # The first line is the list of prefecture names, not a table row
+    return [row for row in lines[1:] if len(row) > 2]
+
+
+def pre00_from_rows(rows, copies=1):
+    """pre00.html built from recorded rows; copies > 1 adds copies under made-up prefecture names ahead of them."""
+    out = ["<html><head><meta charset='utf-8'><title>全国の天候</title></head><body><table>"]
+    for c in range(copies - 1, -1, -1):
+        prev = None
+        for row in rows:
+            pref = row[0] if c == 0 else f"県{c}"
+            cells = [pref if pref != prev else ""] + list(row[1:])
+            prev = pref
+            out.append("<tr>" + "".join(f"<td>{v}</td>" for v in cells) + "</tr>")
+    out.append("</table></body></html>")
+    return "\n".join(out).encode('utf-8')
+
+
+def warning_json():
+    with open(WARNING_FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def saved_page_path(page_type, block_no, year, month):
+    return os.path.join(PAGES_DIR, f"daily_{page_type}_82_{block_no}_{year}_{month:02d}.html")
+
+
+def load_saved_page(page_type, block_no, year, month):
+    with open(saved_page_path(page_type, block_no, year, month), 'rb') as f:
+        return f.read()
+
+
+def save_pages():
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for page_type, block_no, year, month, last_day in SAVED_PAGES:
+        with open(saved_page_path(page_type, block_no, year, month), 'wb') as f:
+            f.write(daily_page(page_type, year, month, last_day=last_day))
+
+
+if __name__ == "__main__":
+    save_pages()
@@ -0,0 +1,186 @@
+"""Local stand-in for the JMA endpoints used by src/main.py.
+
+    python bench/jma_stub.py --port 8000 --latency 0.2 --jitter 0.1 --error-rate 0.05 --truncate-rate 0.02
+    JMA_BASE_URL=http://127.0.0.1:8000 python src/main.py
+
+Serves the recorded responses at the live paths: the saved daily_a1/daily_s1 month
+pages (other months are synthesized), pre00.html built from fukuoka_rows.txt, and the
+warning JSON. Every response gets an ETag and honours If-None-Match. Faults are drawn
+per request: latency + uniform jitter, a 503 at error_rate, and at truncate_rate a
+body cut in half under the full Content-Length.
+
+With JMA_BASE_URL set, main.py writes everything under data/cache/stub instead: the
+published data.json / data.js / meta, caches, the precipitation store, the history,
+metrics and breaker state. docs/ and data/ are left alone.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fixtures
+
+
+def recorded_response(path, query, warning_file=None):
+    """(body, content type) for a request path, or None if it is not a JMA path we serve."""
+    if path.startswith('/obd/stats/etrn/view/daily_'):
+        page_type = path.rsplit('_', 1)[-1].split('.')[0]
+        block_no = query.get('block_no', [''])[0]
+        year, month = int(query['year'][0]), int(query['month'][0])
+        saved = fixtures.saved_page_path(page_type, block_no, year, month)
+        if os.path.exists(saved):
+            with open(saved, 'rb') as f:
+                body = f.read()
+        else:
+            body = fixtures.daily_page(page_type, year, month)
+        return body, 'text/html; charset=Shift_JIS'
+    if path.endswith('/pre00.html'):
+        return fixtures.pre00_from_rows(fixtures.recorded_pre00_rows()), 'text/html; charset=utf-8'
+    if path.startswith('/bosai/warning/data/warning/'):
+        if warning_file:
+            with open(warning_file, 'rb') as f:
+                return f.read(), 'application/json'
+        return fixtures.warning_json(), 'application/json'
+    return None
+
+
+class JMAStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        delay, fault = server.draw()
+        if delay:
+            time.sleep(delay)
+        parsed = urllib.parse.urlparse(self.path)
+        found = recorded_response(parsed.path, urllib.parse.parse_qs(parsed.query), server.warning_file)
+        if found is None:
+            server.count('not_found')
+            self.send_error(404)
+            return
+        if fault == 'error':
+            server.count('errors')
+            self.send_error(503, "Injected failure")
+            return
+
+        body, ctype = found
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            server.count('not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        if fault == 'truncate':
+            server.count('truncated')
+            # Announce the whole body, send half of it and hang up
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        server.count('ok')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency, jitter, error_rate, truncate_rate, seed, warning_file):
+        super().__init__(address, JMAStubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.warning_file = warning_file
+        self.stats = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """(delay in seconds, None | 'error' | 'truncate') for the next request."""
+        with self._lock:
+            self.stats['requests'] = self.stats.get('requests', 0) + 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            r = self._random.random()
+        if r < self.error_rate:
+            return delay, 'error'
+        if r < self.error_rate + self.truncate_rate:
+            return delay, 'truncate'
+        return delay, None
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def handle_error(self, request, client_address):
+        # Clients drop keep-alive connections and abandon streamed bodies; that is not a failure
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class JMAStubServer:
+    def __init__(self, latency=0.0, port=0, jitter=0.0, error_rate=0.0, truncate_rate=0.0, seed=None,
+                 warning_file=None, host='127.0.0.1'):
+        self.httpd = _StubHTTPServer((host, port), latency, jitter, error_rate, truncate_rate, seed, warning_file)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self):
+        return dict(self.httpd.stats)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded JMA responses with injected latency and faults")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra uniform 0..jitter seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='fraction of bodies cut short')
+    parser.add_argument('--seed', type=int, help='seed for reproducible fault sequences')
+    parser.add_argument('--warning', help='warning JSON to serve (default debug_output_utf8.json)')
+    args = parser.parse_args()
+
+    server = JMAStubServer(args.latency, args.port, args.jitter, args.error_rate, args.truncate_rate,
+                           args.seed, args.warning, args.host)
+    with server:
+        print(f"Serving recorded JMA responses on {server.base_url}")
+        print(f"  JMA_BASE_URL={server.base_url} python src/main.py")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(f"Requests: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
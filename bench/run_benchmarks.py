@@ -0,0 +1,174 @@
+"""Offline benchmark suite over the recorded JMA payloads, with regression check.
+
+    python bench/run_benchmarks.py            # compare against bench/baselines.json
+    python bench/run_benchmarks.py --update   # record new baselines
+    python bench/run_benchmarks.py --only advisories
+
+Stages:
+  daily_table   fetch_precip_from_jma's month-page parsing (extract_daily_precip)
+  preliminary   get_preliminary_30day_precip's pre00.html parsing
+  advisories    get_advisories after the download (selective parse + evaluation)
+  levels        level matrices and windows in force over every area (diagnose.py windows)
+
+Each case is run on the recorded fixtures and on scaled-up variants (many stations,
+every prefecture). Median time and tracemalloc peak are compared with the baseline;
+a case slower or hungrier than baseline * (1 + tolerance) fails the run. For time
+the allowance is at least --time-floor ms, since sub-millisecond cases jitter by more
+than 50% from scheduling alone. Baselines are machine-specific, so record them with
+--update on the machine that checks them.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import fixtures
+import main as jma
+from bench_warning_parse import scaled
+from daily_table import extract_daily_precip, CHUNK_SIZE
+from warning_levels import LevelMatrix
+from warning_model import Snapshot
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+TIME_TOLERANCE = 0.5
+TIME_FLOOR_MS = 1.0
+MEMORY_TOLERANCE = 0.2
+# Stations in the "many stations" case and prefectures in the "all prefectures" cases
+STATIONS = 40
+PREFECTURES = 47
+
+
+def chunks(raw):
+    for i in range(0, len(raw), CHUNK_SIZE):
+        yield raw[i:i + CHUNK_SIZE]
+
+
+def daily_table_cases():
+    for page_type, block_no, year, month, _ in fixtures.SAVED_PAGES:
+        raw = fixtures.load_saved_page(page_type, block_no, year, month)
+        yield f"{page_type} {block_no} {year}-{month:02d}", lambda raw=raw, t=page_type: extract_daily_precip(chunks(raw), t)
+    pages = [fixtures.daily_page('a1', 2026, 1, fixtures.precip_values(2026, 1, seed=i)) for i in range(STATIONS)]
+    yield f"a1 x{STATIONS} stations", lambda: [extract_daily_precip(chunks(raw), 'a1') for raw in pages]
+
+
+def preliminary_cases():
+    rows = fixtures.recorded_pre00_rows()
+    recorded = fixtures.pre00_from_rows(rows).decode('utf-8')
+    everywhere = fixtures.pre00_from_rows(rows, copies=PREFECTURES).decode('utf-8')
+    yield "fukuoka_rows", lambda: jma.parse_preliminary_30day(recorded)
+    yield f"fukuoka_rows x{PREFECTURES} prefectures", lambda: jma.parse_preliminary_30day(everywhere)
+
+
+def warning_documents():
+    for name in ('warning_full_utf8.json', 'debug_output_utf8.json'):
+        with open(os.path.join(fixtures.ROOT, name), encoding='utf-8') as f:
+            yield name, json.load(f)
+    with open(os.path.join(fixtures.ROOT, 'kitakyushu_data.json'), encoding='utf-8') as f:
+        areas = json.load(f)
+    yield 'kitakyushu_data.json', {'headlineText': '', 'areaTypes': [{'areas': list(areas.values())}]}
+
+
+def advisories_cases():
+    area = jma.AREA_CODE_KITAKYUSHU_REGION
+    largest = None
+    for name, data in warning_documents():
+        # The live file is served compact
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        yield name, lambda text=text: jma.evaluate_advisories(jma.load_warning_document(text, [area]))
+        if name == 'debug_output_utf8.json':
+            largest = data
+    text = json.dumps(scaled(largest, PREFECTURES), ensure_ascii=False, separators=(',', ':'))
+    yield f"debug_output x{PREFECTURES} areas", lambda: jma.evaluate_advisories(jma.load_warning_document(text, [area]))
+
+
+def levels_cases():
+    largest = None
+    for name, data in warning_documents():
+        if not data.get('timeSeries'):
+            continue
+        yield name, lambda data=data: LevelMatrix(Snapshot(data)).windows(local=True)
+        if name == 'debug_output_utf8.json':
+            largest = data
+    data = scaled(largest, PREFECTURES)
+    yield f"debug_output x{PREFECTURES} areas", lambda: LevelMatrix(Snapshot(data)).windows(local=True)
+
+
+STAGES = {
+    'daily_table': daily_table_cases,
+    'preliminary': preliminary_cases,
+    'advisories': advisories_cases,
+    'levels': levels_cases,
+}
+
+
+def measure(fn, min_time):
+    """Median seconds over enough calls to fill min_time (at least 5), and peak bytes of one call."""
+    fn()  # warm-up
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < 5 or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--update', action='store_true', help='write the results as the new baselines')
+    parser.add_argument('--only', choices=list(STAGES), action='append', help='run only this stage (repeatable)')
+    parser.add_argument('--min-time', type=float, default=0.3, help='seconds of samples per case')
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--time-floor', type=float, default=TIME_FLOOR_MS, help='ms a case may always exceed its baseline by')
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args()
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    try:
+        with open(BASELINES, encoding='utf-8') as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+
+    results = {}
+    failures = []
+    print(f"{'case':<52}{'ms':>9}{'base':>9}{'peak KiB':>10}{'base':>9}")
+    for stage in args.only or list(STAGES):
+        for name, fn in STAGES[stage]():
+            key = f"{stage}: {name}"
+            t, peak = measure(fn, args.min_time)
+            results[key] = {'ms': round(t * 1000, 3), 'peak_kib': round(peak / 1024, 1)}
+            base = baselines.get(key)
+            mark = ""
+            if base and not args.update:
+                if t * 1000 > base['ms'] + max(base['ms'] * args.time_tolerance, args.time_floor):
+                    mark += " SLOWER"
+                if peak / 1024 > base['peak_kib'] * (1 + args.memory_tolerance):
+                    mark += " MEMORY"
+                if mark:
+                    failures.append(key)
+            print(f"{key:<52}{t * 1000:>9.2f}{base['ms'] if base else '-':>9}"
+                  f"{peak / 1024:>10.0f}{base['peak_kib'] if base else '-':>9}{mark}")
+
+    if args.update:
+        baselines.update(results)
+        with open(BASELINES, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines written to {BASELINES}")
+    elif failures:
+        print(f"{len(failures)} regression(s): {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+import argparse
+import bisect
+import json
+import os
+import sys
+
+import atomic_io
+import metrics
+
+# Prebuilt index of JMA forecast areas: offices, class10 (一次細分区域), class15
+# (市町村等をまとめた地域), class20 (市町村等) and the named localAreas of the warning
+# JSON (響灘, 玄界灘, ...), which are the only places a land/sea split shows up.
+#
+#   idx = area_index.get()
+#   idx['4010000'].name                 -> '北九州市'
+#   idx['4010000'].parent.name          -> '北九州・遠賀地区'
+#   idx.search('北九')                  -> areas whose name starts with / contains 北九
+#   idx.is_sea('響灘')                  -> True
+#   idx.sea_names('4010000')            -> ['周防灘', '瀬戸内側の海上', '響灘', '海上']
+#
+# data/area_index.json is versioned and compact (one [name, class, parent] row per code);
+# children and the name tables are derived on load. Rebuild it from JMA's area.json:
+#
+#   python src/area_index.py build                      (fetches bosai/common/const/area.json)
+#   python src/area_index.py build --area-json area.json --warnings warning_full_utf8.json
+#
+# The committed file is an offline seed for 福岡県, entered by hand down to the class15
+# grouping; a build from area.json replaces it. Sea/land and the parents of a localArea
+# carry over between builds; names seen for the first time are reported and count as land.
+
+# Resolved from the repository root: unlike the caches, the judgment cannot run without it
+INDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "area_index.json")
+INDEX_VERSION = 1
+AREA_JSON_PATH = "/bosai/common/const/area.json"
+DEFAULT_OFFICES = ["400000"]
+CLASSES = (('offices', 'office'), ('class10s', 'class10'), ('class15s', 'class15'), ('class20s', 'class20'))
+
+
+class Area:
+    __slots__ = ('code', 'name', 'kind', 'parent', 'children', 'sea')
+
+    def __init__(self, code, name, kind, sea=False):
+        self.code = code
+        self.name = name
+        self.kind = kind
+        self.parent = None
+        self.children = []
+        self.sea = sea
+
+    def ancestors(self):
+        a = self.parent
+        while a is not None:
+            yield a
+            a = a.parent
+
+    def __repr__(self):
+        return f"Area({self.code!r}, {self.name!r}, {self.kind!r})"
+
+
+class AreaIndex:
+    def __init__(self, data):
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"area index version {data.get('version')}, expected {INDEX_VERSION}")
+        self.source = data.get('source')
+        self.by_code = {}
+        self.by_name = {}
+        for code, (name, kind, _) in data['areas'].items():
+            code = sys.intern(code)
+            self.by_code[code] = Area(code, name, kind)
+        for code, (_, _, parent) in data['areas'].items():
+            area = self.by_code[code]
+            area.parent = self.by_code.get(parent)
+            if area.parent is not None:
+                area.parent.children.append(area)
+        # localAreas: [name, code or null, [parent codes], sea]
+        self.local_areas = []
+        for name, code, parents, sea in data.get('local_areas', []):
+            area = Area(code, name, 'local', sea)
+            if parents:
+                area.parent = self.by_code.get(parents[0])
+            for p in parents:
+                if p in self.by_code:
+                    self.by_code[p].children.append(area)
+            if code:
+                self.by_code[code] = area
+            self.local_areas.append(area)
+        for area in list(self.by_code.values()) + [a for a in self.local_areas if not a.code]:
+            self.by_name.setdefault(area.name, []).append(area)
+        self._names = sorted(self.by_name)
+        self._codes = sorted(self.by_code)
+        self._sea_names = {a.name: a.sea for a in self.local_areas}
+
+    def __getitem__(self, code):
+        return self.by_code[code]
+
+    def get(self, code):
+        return self.by_code.get(code)
+
+    def __len__(self):
+        return len(self.by_code)
+
+    def prefix(self, text):
+        """Areas whose name (or, for digits, code) starts with text."""
+        if text.isdigit():
+            i = bisect.bisect_left(self._codes, text)
+            out = []
+            while i < len(self._codes) and self._codes[i].startswith(text):
+                out.append(self.by_code[self._codes[i]])
+                i += 1
+            return out
+        i = bisect.bisect_left(self._names, text)
+        out = []
+        while i < len(self._names) and self._names[i].startswith(text):
+            out.extend(self.by_name[self._names[i]])
+            i += 1
+        return out
+
+    def search(self, text):
+        """Prefix matches first, then names containing text."""
+        hits = self.prefix(text)
+        seen = {id(a) for a in hits}
+        for name in self._names:
+            if text in name and not name.startswith(text):
+                for a in self.by_name[name]:
+                    if id(a) not in seen:
+                        hits.append(a)
+        return hits
+
+    def is_sea(self, name=None, code=None):
+        """Whether a localArea (by code, else by name) is a sea area; anything unknown counts as land."""
+        area = self.by_code.get(code) if code else None
+        if area is not None:
+            return area.sea
+        if not name:
+            return False
+        sea = self._sea_names.get(name)
+        if sea is None:
+            if name not in self.by_name:
+                metrics.count("area_index.unknown_name")
+            return False
+        return sea
+
+    def sea_names(self, area=None):
+        """Names of the sea localAreas; with an area code, only those listed under it or an area containing it."""
+        if area is None:
+            return [name for name, sea in self._sea_names.items() if sea]
+        scope = self.by_code.get(area)
+        if scope is None:
+            return []
+        names = []
+        for a in (scope, *scope.ancestors()):
+            for child in a.children:
+                if child.kind == 'local' and child.sea and child.name not in names:
+                    names.append(child.name)
+        return names
+
+    def mentions_sea(self, text, area=None):
+        """Whether free text (a headline) names a sea area, of the given area if one is given.
+
+        The prefectural headline covers every region, so 玄界灘 in it says nothing about 北九州市.
+        """
+        return any(name in text for name in self.sea_names(area))
+
+
+_index = None
+
+
+def load(path=INDEX_FILE):
+    with open(path, encoding='utf-8') as f:
+        return AreaIndex(json.load(f))
+
+
+def get():
+    """The index in data/area_index.json, loaded once per process."""
+    global _index
+    if _index is None:
+        _index = load()
+    return _index
+
+
+def is_sea(name=None, code=None):
+    return get().is_sea(name, code)
+
+
+def build(area_json, offices=DEFAULT_OFFICES, warning_docs=(), previous=None, source="area.json"):
+    """Index data for offices from an area.json dict, with the localAreas seen in warning_docs."""
+    areas = {}
+    for key, kind in CLASSES:
+        # area.json lists each class after its parent class, so one pass per class is enough
+        for code, entry in area_json.get(key, {}).items():
+            parent = entry.get('parent')
+            if (kind == 'office' and code in offices) or (kind != 'office' and parent in areas):
+                areas[code] = [entry['name'], kind, parent if parent in areas else None]
+
+    local = {}
+    for name, code, parents, sea in (previous or {}).get('local_areas', []):
+        local[name] = [name, code, list(parents), sea]
+    new_names = []
+    for doc in warning_docs:
+        for ts in doc.get('timeSeries', []):
+            for at in ts.get('areaTypes', []):
+                for a in at.get('areas', []):
+                    if a.get('code') not in areas:
+                        continue
+                    for w in a.get('warnings', []):
+                        for level in w.get('levels', []):
+                            for la in level.get('localAreas', []):
+                                name = la.get('localAreaName')
+                                if not name:
+                                    continue
+                                if name not in local:
+                                    local[name] = [name, la.get('localAreaCode'), [], False]
+                                    new_names.append(name)
+                                if a['code'] not in local[name][2]:
+                                    local[name][2].append(a['code'])
+    return {
+        'version': INDEX_VERSION,
+        'source': source,
+        'areas': areas,
+        'local_areas': sorted(local.values()),
+    }, new_names
+
+
+def write(data, path=INDEX_FILE):
+    # One row per line keeps the file diffable and still loads with a single json.load
+    lines = [f'{{"version": {data["version"]}, "source": {json.dumps(data["source"], ensure_ascii=False)},', '"areas": {']
+    rows = [f'{json.dumps(code)}: {json.dumps(row, ensure_ascii=False)}' for code, row in data['areas'].items()]
+    lines.append(",\n".join(rows))
+    lines.append('},\n"local_areas": [')
+    lines.append(",\n".join(json.dumps(row, ensure_ascii=False) for row in data['local_areas']))
+    lines.append(']}')
+    return atomic_io.write_if_changed(path, "\n".join(lines) + "\n")
+
+
+def _fetch_area_json():
+    import fetch_policy
+    import main as jma
+    fetch_policy.start_run()
+    return fetch_policy.get(jma.BOSAI_BASE_URL + AREA_JSON_PATH, timeout=15).json()
+
+
+def _archived_warning_docs():
+    import response_archive
+    archive = response_archive.ARCHIVE
+    shas = {e['sha256'] for e in archive.entries() if e['endpoint'].startswith('/bosai/warning/')}
+    return [json.loads(archive.read(sha)) for sha in sorted(shas)]
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Build or query the JMA area index")
+    parser.add_argument('--index', default=INDEX_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build', help='rebuild the index from area.json')
+    p.add_argument('--area-json', help='local copy of area.json (default: fetch it)')
+    p.add_argument('--office', action='append', help=f'office code to include (default {DEFAULT_OFFICES[0]})')
+    p.add_argument('--warnings', nargs='*', help='warning JSON files to take localAreas from (default: the response archive)')
+    p = sub.add_parser('lookup')
+    p.add_argument('code')
+    p = sub.add_parser('search')
+    p.add_argument('text')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.area_json:
+            with open(args.area_json, encoding='utf-8') as f:
+                area_json = json.load(f)
+        else:
+            area_json = _fetch_area_json()
+        docs = []
+        if args.warnings is None:
+            docs = _archived_warning_docs()
+        for path in args.warnings or ():
+            with open(path, encoding='utf-8') as f:
+                docs.append(json.load(f))
+        try:
+            with open(args.index, encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = None
+        data, new_names = build(area_json, args.office or DEFAULT_OFFICES, docs, previous)
+        changed = write(data, args.index)
+        print(f"{len(data['areas'])} areas, {len(data['local_areas'])} localAreas -> {args.index}"
+              + ("" if changed else " (unchanged)"))
+        for name in new_names:
+            print(f"New localArea '{name}' recorded as land; set its sea flag in {args.index} if it is a sea area")
+        return
+
+    if not os.path.exists(args.index):
+        raise SystemExit(f"{args.index} not found; run 'build' first")
+    idx = load(args.index)
+    if args.command == 'lookup':
+        area = idx.get(args.code)
+        if area is None:
+            print(f"{args.code} not found")
+            return
+        print(f"{area.code} {area.name} ({area.kind}{', sea' if area.sea else ''})")
+        path = " < ".join(f"{a.code} {a.name}" for a in area.ancestors())
+        if path:
+            print(f"  in: {path}")
+        for child in area.children:
+            print(f"  - {child.code or '-'} {child.name} ({child.kind}{', sea' if child.sea else ''})")
+    else:
+        for area in idx.search(args.text):
+            parent = f" < {area.parent.name}" if area.parent else ""
+            print(f"{area.code or '-':<8} {area.name} ({area.kind}{', sea' if area.sea else ''}){parent}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+
+# Output files are written to a temp file and renamed into place, so a reader (or a
+# crash) never sees half a file, and a file whose bytes would not change is not
+# touched at all: no write, no new mtime, nothing for git to commit.
+
+
+def write_if_changed(path, data):
+    """Writes data (str or bytes) to path atomically unless the file already holds it.
+
+    Returns True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
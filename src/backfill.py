@@ -0,0 +1,146 @@
+import argparse
+import calendar
+import csv
+import datetime
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import main as jma
+
+# Historical backfill: confirmed daily precipitation for one station over a date range,
+# then the 3-day / 30-day totals and judgment level for every morning in one pass.
+#
+#   python src/backfill.py --start 2024-01-01 --end 2025-12-31
+#
+# Advisories are not archived by JMA, so only the precipitation branch of the rule
+# (p3d <= 1.0 and p30d <= 30.0) is evaluated; the result is level 0 or 1.
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # requests per second to www.data.jma.go.jp
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def month_range(start, end):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def fetch_daily_series(start, end, prec_no, block_no, page_type='a1', workers=DEFAULT_WORKERS, rate=DEFAULT_RATE):
+    """Returns {date: precip} for start..end; days JMA has no value for are left out."""
+    limiter = RateLimiter(rate)
+
+    def fetch_month(ym):
+        year, month = ym
+        days = range(1, calendar.monthrange(year, month)[1] + 1)
+        dates = [datetime.date(year, month, d) for d in days if start <= datetime.date(year, month, d) <= end]
+        # Cached months do not touch the network, so they skip the limiter
+        if jma.PRECIP_CACHE.get(prec_no, block_no, page_type, year, month, [d.day for d in dates]) is None:
+            limiter.wait()
+        _, month_map, _ = jma.fetch_precip_from_jma(dates, prec_no, block_no, page_type, concurrent=False)
+        return month_map
+
+    series = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for month_map in pool.map(fetch_month, month_range(start, end)):
+            series.update(month_map)
+    return series
+
+
+def rolling_levels(start, end, series):
+    """Vectorized p3d / p30d / level for every run date in start..end.
+
+    A run on day D uses D-3..D-1 for p3d and D-30..D-1 for p30d, the same
+    windows as the daily job. Windows with a missing day are NaN, level -1.
+    """
+    days = (end - start).days + 1
+    # Leading 30 days so the first run date has a full window
+    origin = start - datetime.timedelta(days=30)
+    n = days + 30
+    daily = np.full(n, np.nan)
+    for d, v in series.items():
+        i = (d - origin).days
+        if 0 <= i < n:
+            daily[i] = v
+
+    csum = np.concatenate(([0.0], np.cumsum(np.nan_to_num(daily))))
+    missing = np.concatenate(([0], np.cumsum(np.isnan(daily))))
+    run_idx = np.arange(30, n)
+
+    def window(size):
+        total = csum[run_idx] - csum[run_idx - size]
+        gaps = missing[run_idx] - missing[run_idx - size]
+        return np.where(gaps == 0, np.round(total, 1), np.nan)
+
+    p3d = window(3)
+    p30d = window(30)
+    level = np.where(np.isnan(p3d) | np.isnan(p30d), -1, ((p3d <= 1.0) & (p30d <= 30.0)).astype(int))
+    return daily[30:], p3d, p30d, level
+
+
+def write_csv(path, start, daily, p3d, p30d, level):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date', 'precip', 'p3d', 'p30d', 'level'])
+        for i in range(len(daily)):
+            d = start + datetime.timedelta(days=i)
+            writer.writerow([
+                d.isoformat(),
+                '' if np.isnan(daily[i]) else daily[i],
+                '' if np.isnan(p3d[i]) else p3d[i],
+                '' if np.isnan(p30d[i]) else p30d[i],
+                int(level[i]),
+            ])
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Backfill daily precipitation and judgment levels")
+    parser.add_argument('--start', required=True, type=datetime.date.fromisoformat)
+    parser.add_argument('--end', required=True, type=datetime.date.fromisoformat)
+    parser.add_argument('--prec', default=jma.TARGET_STATION_PREF)
+    parser.add_argument('--block', default=jma.TARGET_STATION_BLOCK)
+    parser.add_argument('--page-type', default='a1', choices=['a1', 's1'])
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='max requests per second')
+    parser.add_argument('--out', help='CSV path (default data/backfill_<prec>_<block>.csv)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    fetch_from = args.start - datetime.timedelta(days=30)
+    series = fetch_daily_series(fetch_from, args.end, args.prec, args.block, args.page_type, args.workers, args.rate)
+    fetched = time.perf_counter()
+    daily, p3d, p30d, level = rolling_levels(args.start, args.end, series)
+    computed = time.perf_counter()
+
+    out = args.out or f"data/backfill_{args.prec}_{args.block}.csv"
+    write_csv(out, args.start, daily, p3d, p30d, level)
+    print(f"{len(level)} days: level1={int((level == 1).sum())} level0={int((level == 0).sum())} unknown={int((level == -1).sum())}")
+    print(f"fetch {fetched - started:.2f}s, rolling sums {1000 * (computed - fetched):.1f}ms -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Draws the result card of docs/index.html straight from docs/data.json with Pillow,
+# so the notification mail gets its image without starting a browser.
+# Colours and layout follow docs/style.css. Japanese text needs a CJK font; when none
+# of FONT_CANDIDATES (or $CARD_FONT) exists, the card is drawn with ASCII labels.
+
+WIDTH = 600
+PADDING = 20
+
+BG = "#f4f6f9"
+CARD_BG = "#ffffff"
+TEXT_MAIN = "#333333"
+TEXT_SUB = "#666666"
+BORDER = "#eeeeee"
+ALERT = "#dc3545"
+# level: (border / icon colour, background, status text colour)
+LEVEL_COLORS = {
+    0: ("#28a745", "#e6f9ed", "#28a745"),
+    1: ("#ffc107", "#fffbf0", "#856404"),
+    2: ("#dc3545", "#ffeef0", "#721c24"),
+    None: ("#6c757d", "#f1f3f5", "#6c757d"),  # 判定不能
+}
+
+FONT_CANDIDATES = [
+    # (regular, bold)
+    ("/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc", "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc"),
+    ("/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc", "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc"),
+    ("/usr/share/fonts/truetype/fonts-japanese-gothic.ttf", "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf"),
+    ("C:/Windows/Fonts/meiryo.ttc", "C:/Windows/Fonts/meiryob.ttc"),
+    ("C:/Windows/Fonts/msgothic.ttc", "C:/Windows/Fonts/msgothic.ttc"),
+    ("/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc", "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc"),
+]
+ASCII_FONTS = ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+
+LABELS = {
+    'title': ("気象条件自動判定システム", "Weather Condition Check"),
+    'subtitle': ("北九州市消防局 内部利用 (八幡観測所基準)", "Kitakyushu City Fire Bureau (Yahata station)"),
+    'heading': ("本日の判定結果", "Today's result"),
+    'updated': ("更新日時: ", "Updated: "),
+    'precip': ("降水量 (八幡)", "Precipitation (Yahata)"),
+    'p3d': ("前3日 (確定値)", "Prev. 3 days"),
+    'p30d': ("前30日", "Prev. 30 days"),
+    'confirmed': (" (確定値)", ""),
+    'estimated': (" (推定値)", " (est.)"),
+    'advisory': ("気象注意報 (北九州市)", "Advisories (Kitakyushu)"),
+    'dry': ("乾燥注意報", "Dry"),
+    'wind': ("強風注意報", "Strong wind"),
+    'issued': ("発表中", "Issued"),
+    'none': ("なし", "None"),
+    'unknown': ("不明", "Unknown"),
+    'failed': ("取得失敗", "Unavailable"),
+}
+ASCII_RESULTS = {0: "No alert", 1: "Caution level", 2: "Warning level", None: "Undetermined"}
+
+
+def find_fonts():
+    """(regular path, bold path, cjk) for the first installed font pair."""
+    override = os.environ.get("CARD_FONT")
+    if override and os.path.exists(override):
+        return override, override, True
+    for regular, bold in FONT_CANDIDATES:
+        if os.path.exists(regular):
+            return regular, bold if os.path.exists(bold) else regular, True
+    regular, bold = ASCII_FONTS
+    if os.path.exists(regular):
+        return regular, bold if os.path.exists(bold) else regular, False
+    return None, None, False
+
+
+class _Fonts:
+    def __init__(self, scale):
+        regular, bold, self.cjk = find_fonts()
+        self._paths = {'regular': regular, 'bold': bold}
+        self._scale = scale
+        self._cache = {}
+
+    def get(self, size, weight='regular'):
+        key = (size, weight)
+        if key not in self._cache:
+            path = self._paths[weight]
+            if path:
+                self._cache[key] = ImageFont.truetype(path, int(size * self._scale))
+            else:
+                self._cache[key] = ImageFont.load_default()
+        return self._cache[key]
+
+
+def _texts(data, cjk):
+    """Display strings for the card; ASCII stand-ins when no CJK font is available."""
+    label = {k: v[0] if cjk else v[1] for k, v in LABELS.items()}
+    level = data['level']
+    result = data['result_text'] if cjk else ASCII_RESULTS.get(level, str(level))
+
+    def status(value):
+        return label['unknown'] if value is None else label['issued'] if value else label['none']
+
+    dry = status(data['is_dry'])
+    wind = status(data['is_strong_wind'])
+    if cjk and data.get('wind_text'):
+        wind = data['wind_text']
+    # p30d falls back to the preliminary pre00.html value; the label says which one it is
+    source = data.get('p30d_source') or ''
+    if '推定値' in source:
+        label['p30d'] += label['estimated']
+    elif '確定値' in source:
+        label['p30d'] += label['confirmed']
+    return label, result, dry, wind
+
+
+def render_card(data, path, scale=1):
+    """Writes the result card for data (the docs/data.json dict) to path as PNG."""
+    fonts = _Fonts(scale)
+    label, result, dry_text, wind_text = _texts(data, fonts.cjk)
+    level = data['level']
+    edge, level_bg, level_text = LEVEL_COLORS.get(level, LEVEL_COLORS[0])
+
+    def s(v):
+        return int(v * scale)
+
+    height = 470
+    img = Image.new("RGB", (s(WIDTH), s(height)), BG)
+    draw = ImageDraw.Draw(img)
+
+    def text(x, y, value, size, fill=TEXT_MAIN, weight='regular', anchor='la'):
+        draw.text((s(x), s(y)), value, font=fonts.get(size, weight), fill=fill, anchor=anchor)
+
+    center = WIDTH / 2
+    text(center, 28, label['title'], 24, weight='bold', anchor='mt')
+    text(center, 64, label['subtitle'], 14, fill=TEXT_SUB, anchor='mt')
+
+    # Result card
+    top, bottom = 96, 262
+    draw.rounded_rectangle((s(PADDING), s(top), s(WIDTH - PADDING), s(bottom)), radius=s(12),
+                           fill=level_bg, outline=edge, width=max(1, s(2)))
+    text(center, top + 20, label['heading'], 16, fill=TEXT_SUB, weight='bold', anchor='mt')
+    # Level marker in place of the emoji icon, which most fonts cannot draw
+    r = 22
+    cy = top + 72
+    draw.ellipse((s(center - r), s(cy - r), s(center + r), s(cy + r)), fill=edge)
+    text(center, cy, "?" if level is None else str(level), 24, fill=CARD_BG, weight='bold', anchor='mm')
+    text(center, cy + 40, result, 24, fill=level_text, weight='bold', anchor='mt')
+    text(center, bottom - 26, label['updated'] + data['updated_at'], 13, fill=TEXT_SUB, anchor='mt')
+
+    # Detail cards
+    gap = 16
+    card_w = (WIDTH - 2 * PADDING - gap) / 2
+    top, bottom = bottom + 16, height - PADDING
+
+    def detail(x, heading, rows):
+        draw.rounded_rectangle((s(x), s(top), s(x + card_w), s(bottom)), radius=s(12), fill=CARD_BG)
+        text(x + 16, top + 18, heading, 14, fill=TEXT_SUB, weight='bold')
+        draw.line((s(x + 16), s(top + 46), s(x + card_w - 16), s(top + 46)), fill=BORDER, width=max(1, s(1)))
+        y = top + 64
+        for name, value, alert in rows:
+            text(x + 16, y, name, 15)
+            text(x + card_w - 16, y, value, 15, fill=ALERT if alert else TEXT_MAIN, weight='bold', anchor='ra')
+            y += 40
+
+    def precip(value, threshold):
+        if value is None:
+            return label['failed'], False
+        return f"{float(value):.1f} mm", float(value) <= threshold
+
+    detail(PADDING, label['precip'], [
+        (label['p3d'], *precip(data['p3d'], 1.0)),
+        (label['p30d'], *precip(data['p30d'], 30.0)),
+    ])
+    detail(PADDING + card_w + gap, label['advisory'], [
+        (label['dry'], dry_text, bool(data['is_dry'])),
+        (label['wind'], wind_text, bool(data['is_strong_wind'])),
+    ])
+
+    img.save(path, optimize=True)
+    return path
@@ -0,0 +1,112 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Streaming extractor for the daily_a1 / daily_s1 month tables.
+# Only the day cell and the precipitation cell of each tr.mtx row are kept, and
+# reading stops as soon as the requested days are in (or the table ends).
+
+PRECIP_COLUMN = {'a1': 1, 's1': 3}
+CHUNK_SIZE = 8192
+
+
+class FetchCancelled(Exception):
+    """The caller no longer needs the page (see extract_daily_precip's cancel)."""
+
+
+def parse_precip_value(text):
+    """'--', '///' and '0.0)' count as no rain; otherwise keep the digits ('1.5)' -> 1.5)."""
+    if text in ["--", "///", "0.0)"]:
+        return 0.0
+    clean = re.sub(r'[^\d\.]', '', text)
+    return float(clean) if clean else 0.0
+
+
+class _DailyTableParser(HTMLParser):
+    def __init__(self, precip_col, days=None):
+        super().__init__(convert_charrefs=True)
+        self.precip_col = precip_col
+        self.wanted = set(days) if days else None
+        self.values = {}
+        self.done = False
+        self._in_row = False
+        self._cell = -1
+        self._in_cell = False
+        self._text = []
+        self._day_text = None
+        self._val_text = None
+        self._seen_rows = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            classes = (dict(attrs).get('class') or '').split()
+            self._in_row = 'mtx' in classes
+            self._cell = -1
+            self._day_text = self._val_text = None
+        elif tag == 'td' and self._in_row:
+            self._end_cell()
+            self._cell += 1
+            self._in_cell = self._cell in (0, self.precip_col)
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == 'td':
+            self._end_cell()
+        elif tag == 'tr' and self._in_row:
+            self._end_cell()
+            self._end_row()
+            self._in_row = False
+        elif tag == 'table' and self._seen_rows:
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_cell:
+            self._text.append(data)
+
+    def _end_cell(self):
+        if not self._in_cell:
+            return
+        text = ''.join(self._text).strip()
+        if self._cell == 0:
+            self._day_text = text
+        else:
+            self._val_text = text
+        self._in_cell = False
+
+    def _end_row(self):
+        if self._day_text is None or not self._day_text.isdigit():
+            return
+        self._seen_rows = True
+        day = int(self._day_text)
+        if self.wanted is not None and day not in self.wanted:
+            return
+        if self._cell < self.precip_col:
+            val = 0.0
+        elif not self._val_text:
+            # Not observed yet
+            return
+        else:
+            val = parse_precip_value(self._val_text)
+        self.values[day] = val
+        if self.wanted is not None and self.wanted.issubset(self.values):
+            self.done = True
+
+
+def extract_daily_precip(chunks, page_type='a1', days=None, encoding='shift_jis', cancel=None):
+    """Returns {day: precip_mm} from an iterable of raw page chunks.
+
+    With days given, the remaining chunks are not read once those days are found.
+    cancel is an optional threading.Event; once it is set, FetchCancelled is raised
+    before the next chunk is read.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    parser = _DailyTableParser(PRECIP_COLUMN[page_type], days)
+    for chunk in chunks:
+        if cancel is not None and cancel.is_set():
+            raise FetchCancelled()
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            return parser.values
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    return parser.values
@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+import area_index
+import atomic_io
+import fetch_policy
+import main as jma
+from warning_levels import LevelMatrix
+from warning_model import Snapshot
+
+# Diagnostics over the warning JSON (400000.json) and pre00.html.
+#
+#   python src/diagnose.py summary
+#   python src/diagnose.py warnings --code 15 --active
+#   python src/diagnose.py levels 4010000 --code 15 --active
+#   python src/diagnose.py find 4010100
+#   python src/diagnose.py windows --area 4010000 --local
+#   python src/diagnose.py search 北九州
+#   python src/diagnose.py dump kitakyushu_data.json --area 4010000 --area 4010100
+#   python src/diagnose.py pre00 --match 福岡
+#
+# The document is downloaded once into data/cache and reused for SNAPSHOT_MAX_AGE
+# seconds (--refresh forces a download, --file reads a recorded copy such as
+# warning_full_utf8.json), then parsed into warning_model.Snapshot; every subcommand
+# is a query over that model. Replaces the one-off check_* / debug_* scripts.
+
+SNAPSHOT_FILE = "data/cache/warning_snapshot.json"
+PRE00_FILE = "data/cache/pre00_snapshot.html"
+SNAPSHOT_MAX_AGE = 10 * 60
+
+
+def cached_body(url, path, refresh=False, max_age=SNAPSHOT_MAX_AGE, timeout=10):
+    """Body of url, from path if it is younger than max_age; a stale copy stands in when the fetch fails."""
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        age = None
+    if refresh or age is None or age >= max_age:
+        fetch_policy.start_run()
+        try:
+            resp = fetch_policy.get(url, timeout=timeout)
+            atomic_io.write_if_changed(path, resp.content)
+            # An unchanged body is not rewritten; the mtime still records that it was checked
+            os.utime(path)
+            age = 0
+        except fetch_policy.FetchFailed as e:
+            if age is None:
+                raise SystemExit(f"Could not fetch {url}: {e}")
+            print(f"Fetch failed ({e}); using the copy from {age / 60:.0f} min ago", file=sys.stderr)
+    with open(path, 'rb') as f:
+        return f.read(), age
+
+
+def load_snapshot(args):
+    if args.file:
+        with open(args.file, 'rb') as f:
+            body, source = f.read(), args.file
+    else:
+        body, age = cached_body(jma.WARNING_JSON_URL, SNAPSHOT_FILE, args.refresh, args.max_age)
+        source = f"{SNAPSHOT_FILE} ({age / 60:.0f} min old)"
+    started = time.perf_counter()
+    snap = Snapshot.from_text(body.decode('utf-8'))
+    parse_ms = 1000 * (time.perf_counter() - started)
+    return snap, body, source, parse_ms
+
+
+def cmd_summary(snap, args, source, parse_ms):
+    print(f"Source: {source}, parsed in {parse_ms:.1f} ms")
+    print(f"Report time: {snap.report_datetime} ({snap.office})")
+    for i, codes in enumerate(snap.area_types):
+        print(f"areaTypes[{i}]: {len(codes)} areas, e.g. {', '.join(codes[:5])}")
+    for i, codes in enumerate(snap.series_areas):
+        print(f"timeSeries[{i}]: {len(codes)} areas, {len(snap.time_defines[i])} time steps "
+              f"({snap.time_defines[i][0] if snap.time_defines[i] else '-'} ...)")
+    active = {w.area for w in snap.warnings(active_only=True)}
+    print(f"Areas with an active warning: {len(active)}")
+
+
+def cmd_headline(snap, args):
+    print(snap.headline or "(no headline)")
+
+
+def cmd_warnings(snap, args):
+    rows = list(snap.warnings(args.area, args.code, args.active))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([w.as_dict() for w in rows], f, ensure_ascii=False, indent=2)
+        print(f"{len(rows)} warnings written to {args.json}")
+        return
+    for w in rows:
+        print(f"{w.area:<8} {w.code:<3} {w.status}")
+    print(f"{len(rows)} warnings in {len({w.area for w in rows})} areas")
+
+
+def cmd_codes(snap, args):
+    print("Warning codes (status: areas):")
+    for code, by_status in sorted(snap.codes().items()):
+        print(f"  {code}: " + ", ".join(f"{s} {n}" for s, n in by_status.items()))
+    print("Area codes:")
+    for i, codes in enumerate(snap.area_types):
+        print(f"  areaTypes[{i}]: {' '.join(codes)}")
+    for i, codes in enumerate(snap.series_areas):
+        print(f"  timeSeries[{i}]: {' '.join(codes)}")
+
+
+def _print_levels(rows):
+    for r in rows:
+        place = f"{r.name or '-'}" + (f" [{r.local_code}]" if r.local_code else "")
+        sea = " (sea)" if r.is_sea else ""
+        extra = f" +{','.join(r.additions)}" if r.additions else ""
+        print(f"  {r.code:<3} {r.level_type or '-'} {place}{sea}: {' '.join(v or '--' for v in r.values)}{extra}")
+
+
+def cmd_levels(snap, args):
+    codes = [args.code] if args.code else sorted({code for area, code in snap.levels if area == args.area})
+    for code in codes:
+        rows = [r for r in snap.local_areas(args.area, code) if not args.active or r.active]
+        if not rows:
+            continue
+        series = rows[0].series
+        print(f"{args.area} code {code}, timeSeries[{series}] from {snap.time_defines[series][0]}:")
+        _print_levels(rows)
+        if args.active:
+            print(f"  active: {sorted({r.name or '-' for r in rows})}")
+
+
+def cmd_windows(snap, args):
+    matrix = LevelMatrix(snap)
+    rows = matrix.windows(args.area, args.code, args.local)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=1)
+        print(f"{len(rows)} windows written to {args.json}")
+        return
+    names = area_index.get()
+    for w in rows:
+        area = names.get(w['area'])
+        place = f"{w['area']} {area.name if area else ''}".rstrip()
+        if w['local']:
+            place += f" / {w['local']}"
+        print(f"{place:<28} {w['code']:<3} {w['from'][:16]} - {w['to'][:16]}  peak {w['peak']}")
+    peaks = {k: p for k, p in matrix.peaks().items()
+             if (args.area is None or k[0] == args.area) and (args.code is None or k[1] == args.code)}
+    print(f"{len(rows)} windows; {sum(1 for p in peaks.values() if p >= 10)} of {len(peaks)} (area, code) pairs reach advisory level")
+
+
+def cmd_find(snap, args):
+    area = area_index.get().get(args.code)
+    if area is not None:
+        parents = " < ".join(a.name for a in area.ancestors())
+        print(f"{area.code} {area.name} ({area.kind}{', sea' if area.sea else ''}{', in ' + parents if parents else ''})")
+    found = False
+    if args.code in snap.status:
+        found = True
+        statuses = ", ".join(f"{w.code} {w.status}" for w in snap.status[args.code]) or "no warnings"
+        print(f"Area {args.code}: {statuses}")
+    for (area, code), rows in snap.levels.items():
+        hits = [r for r in rows if area == args.code or r.local_code == args.code]
+        if hits:
+            found = True
+            print(f"Levels of {area} code {code}:")
+            _print_levels(hits)
+    if not found:
+        print(f"{args.code} does not appear in the warning document")
+
+
+def cmd_search(snap, args):
+    text = args.text
+    if text in snap.headline:
+        print(f"headline: {snap.headline}")
+    names = {}
+    for rows in snap.levels.values():
+        for r in rows:
+            for value in (r.name, r.level_type, *r.additions):
+                if value and text in value:
+                    names.setdefault(value, set()).add((r.area, r.code))
+    for value, where in sorted(names.items()):
+        print(f"{value}: " + ", ".join(f"{a}/{c}" for a, c in sorted(where)))
+    codes = sorted(c for c in snap.status if text in c)
+    if codes:
+        print(f"area codes: {' '.join(codes)}")
+    if not names and not codes and text not in snap.headline:
+        print(f"'{text}' not found")
+
+
+def cmd_dump(snap, args, body):
+    if not args.area:
+        with open(args.out, 'wb') as f:
+            f.write(body)
+        print(f"Snapshot written to {args.out}")
+        return
+    # Same layout as the old kitakyushu_data.json: area code -> areaTypes entry
+    data = json.loads(body)
+    res = {}
+    for at in data.get('areaTypes', []):
+        for a in at.get('areas', []):
+            if a.get('code') in args.area:
+                res[a['code']] = a
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(res, f, ensure_ascii=False, indent=2)
+    print(f"{len(res)} areas written to {args.out}")
+
+
+def cmd_pre00(args):
+    body, _ = cached_body(jma.TENKOU_URL, PRE00_FILE, args.refresh, args.max_age, timeout=15)
+    soup = BeautifulSoup(body, 'html.parser')
+    for tr in soup.find_all('tr'):
+        cells = [c.get_text(strip=True) for c in tr.find_all(['th', 'td'])]
+        if args.match in "".join(cells):
+            print(cells)
+
+
+COMMANDS = {
+    'headline': cmd_headline,
+    'warnings': cmd_warnings,
+    'codes': cmd_codes,
+    'levels': cmd_levels,
+    'find': cmd_find,
+    'windows': cmd_windows,
+    'search': cmd_search,
+}
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Diagnostics over the JMA warning JSON and pre00.html")
+    parser.add_argument('--file', help='read a recorded warning JSON instead of the cached snapshot')
+    parser.add_argument('--refresh', action='store_true', help='download a new snapshot')
+    parser.add_argument('--max-age', type=float, default=SNAPSHOT_MAX_AGE, help='seconds a snapshot is reused')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('summary', help='report time, area types and time axes')
+    sub.add_parser('headline')
+    p = sub.add_parser('warnings', help='warning status per area')
+    p.add_argument('--area')
+    p.add_argument('--code')
+    p.add_argument('--active', action='store_true', help='only 発表 / 継続')
+    p.add_argument('--json', help='write the rows to this file instead')
+    sub.add_parser('codes', help='warning codes and area codes in the document')
+    p = sub.add_parser('levels', help='localArea level series of one area')
+    p.add_argument('area')
+    p.add_argument('--code')
+    p.add_argument('--active', action='store_true', help='only rows with a value >= 10')
+    p = sub.add_parser('windows', help='intervals in force and peak level per area and code, from timeSeries')
+    p.add_argument('--area')
+    p.add_argument('--code')
+    p.add_argument('--local', action='store_true', help='one row per localArea instead of per area')
+    p.add_argument('--json', help='write the windows to this file instead')
+    p = sub.add_parser('find', help='everything recorded for an area or localArea code')
+    p.add_argument('code')
+    p = sub.add_parser('search', help='substring search over the headline, local area names and level types')
+    p.add_argument('text')
+    p = sub.add_parser('dump', help='write the snapshot, or only some areaTypes areas, to a file')
+    p.add_argument('out')
+    p.add_argument('--area', action='append')
+    p = sub.add_parser('pre00', help='rows of pre00.html containing a string')
+    p.add_argument('--match', default='福岡')
+    args = parser.parse_args()
+
+    if args.command == 'pre00':
+        cmd_pre00(args)
+        return
+    snap, body, source, parse_ms = load_snapshot(args)
+    if args.command == 'summary':
+        cmd_summary(snap, args, source, parse_ms)
+    elif args.command == 'dump':
+        cmd_dump(snap, args, body)
+    else:
+        COMMANDS[args.command](snap, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+
+import jma_client
+import metrics
+import response_archive
+
+# Retry policy for every JMA request: one deadline for the whole run, jittered
+# exponential backoff between attempts, and a circuit breaker per endpoint.
+#
+# A breaker opens after BREAKER_THRESHOLD consecutive failed requests to an endpoint
+# (host + path, so every month of daily_a1 shares one; a request fails once, after all
+# its attempts) and rejects requests for BREAKER_COOLDOWN seconds, after which a single
+# trial request decides whether it closes again. Breaker state is kept in
+# data/cache/breakers.json, so it carries over between cron runs and polls in watch mode.
+#
+# Every body downloaded in full is added to the response archive (a 304 is not: its
+# body was archived when it was first downloaded); in replay mode the archive answers
+# instead of JMA and the policy is bypassed.
+
+BREAKER_FILE = "data/cache/breakers.json"
+RUN_DEADLINE = 60.0
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 10 * 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchFailed(Exception):
+    """The request could not be completed within the policy (attempts, deadline or open breaker)."""
+
+
+class DeadlineExceeded(FetchFailed):
+    pass
+
+
+class CircuitOpen(FetchFailed):
+    pass
+
+
+class Cancelled(FetchFailed):
+    """The caller's cancel event was set before the request finished its attempts."""
+
+
+_deadline = None
+
+
+def start_run(seconds=RUN_DEADLINE):
+    """Starts the deadline every request of this run has to finish within."""
+    global _deadline
+    _deadline = time.monotonic() + seconds
+
+
+def remaining():
+    return float('inf') if _deadline is None else _deadline - time.monotonic()
+
+
+def check_deadline():
+    if remaining() <= 0:
+        raise DeadlineExceeded("run deadline exceeded")
+
+
+def endpoint_of(url):
+    parts = urllib.parse.urlsplit(url)
+    return parts.netloc + parts.path
+
+
+class Breakers:
+    def __init__(self, path=BREAKER_FILE, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._state = None
+        self._trial = set()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._state is None:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def allow(self, endpoint):
+        with self._lock:
+            entry = self._load().get(endpoint)
+            if not entry or entry.get('open_until', 0) == 0:
+                return True
+            if time.time() < entry['open_until'] or endpoint in self._trial:
+                return False
+            # Cool-down over: let one request through to probe the endpoint
+            self._trial.add(endpoint)
+            return True
+
+    def success(self, endpoint):
+        with self._lock:
+            state = self._load()
+            self._trial.discard(endpoint)
+            if state.pop(endpoint, None) is not None:
+                self._save()
+
+    def release(self, endpoint):
+        """Ends a request that neither succeeded nor failed (cancelled); a trial slot is freed."""
+        with self._lock:
+            self._trial.discard(endpoint)
+
+    def failure(self, endpoint):
+        with self._lock:
+            state = self._load()
+            entry = state.setdefault(endpoint, {'failures': 0, 'open_until': 0})
+            entry['failures'] += 1
+            if endpoint in self._trial or entry['failures'] >= self.threshold:
+                if entry['open_until'] == 0 or endpoint in self._trial:
+                    metrics.count("breaker.opened")
+                entry['open_until'] = time.time() + self.cooldown
+            self._trial.discard(endpoint)
+            self._save()
+
+
+BREAKERS = Breakers()
+
+
+def get(url, timeout=10, attempts=MAX_ATTEMPTS, cancel=None, **kwargs):
+    """jma_client.get under the policy; raises FetchFailed instead of returning a bad response.
+
+    cancel (a threading.Event) is checked before and after every attempt and ends a backoff
+    wait early; a cancelled request raises Cancelled and is not counted against the breaker.
+    """
+    if response_archive.replay_at is not None:
+        resp = response_archive.ARCHIVE.response(url, response_archive.replay_at)
+        if resp is None:
+            raise FetchFailed(f"{url}: nothing archived before {response_archive.replay_at:%Y-%m-%d %H:%M}")
+        return resp
+    endpoint = endpoint_of(url)
+    if cancel is not None and cancel.is_set():
+        raise Cancelled(f"{url}: cancelled")
+    check_deadline()
+    # The breaker is asked once per request and told once how it ended, however many
+    # attempts that took: the parallel month fetches of one run share an endpoint, and
+    # their retries must not open the breaker under each other
+    if not BREAKERS.allow(endpoint):
+        metrics.count("breaker.rejected")
+        raise CircuitOpen(f"circuit open for {endpoint}")
+    last_error = None
+    for attempt in range(attempts):
+        if attempt and remaining() <= 0:
+            break
+        try:
+            resp = jma_client.get(url, timeout=min(timeout, max(remaining(), 0.1)), **kwargs)
+        except Exception as e:
+            resp, last_error = None, e
+        if cancel is not None and cancel.is_set():
+            # The caller stopped waiting for this; how it ended says nothing about the endpoint
+            if resp is not None:
+                resp.close()
+            BREAKERS.release(endpoint)
+            raise Cancelled(f"{url}: cancelled")
+        if resp is not None:
+            if resp.status_code not in RETRY_STATUSES:
+                # A 4xx is a bad request, not an outage; it is not retried and does not trip the breaker
+                BREAKERS.success(endpoint)
+                if resp.status_code >= 400:
+                    resp.close()
+                    raise FetchFailed(f"{url}: HTTP {resp.status_code}")
+                # A streamed body is archived by the caller once it has been read; a 304
+                # answered from jma_client's cache is a body the archive already holds
+                if not kwargs.get('stream') and not resp.from_cache:
+                    response_archive.record(url, resp.content, resp.headers.get('Content-Type'))
+                return resp
+            resp.close()
+            last_error = f"HTTP {resp.status_code}"
+        if attempt + 1 < attempts:
+            delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+            if delay >= remaining():
+                break
+            metrics.count("retries")
+            if cancel is None:
+                time.sleep(delay)
+            elif cancel.wait(delay):
+                BREAKERS.release(endpoint)
+                raise Cancelled(f"{url}: cancelled")
+    BREAKERS.failure(endpoint)
+    raise FetchFailed(f"{url}: {last_error}")
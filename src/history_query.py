@@ -0,0 +1,107 @@
+import argparse
+import datetime
+import sys
+
+from history_store import HistoryStore
+
+# Queries over the run history (data/history.db).
+#
+#   python src/history_query.py months --from 2025-12-01 --to 2026-02-28
+#   python src/history_query.py count --level 2 --from 2025-12-01 --to 2026-02-28
+#   python src/history_query.py stats
+#   python src/history_query.py streak --dry
+#
+# Counts and statistics come from the per-month summaries; streaks are found in a
+# single pass over the daily rows of the range. Each day is represented by its
+# last run.
+
+
+def combine(rows):
+    """Folds per-month summary rows into one set of totals."""
+    total = {'days': 0, 'level0': 0, 'level1': 0, 'level2': 0}
+    stats = {}
+    for r in rows:
+        for k in total:
+            total[k] += r[k] or 0
+        for col in ('p3d', 'p30d'):
+            if not r[col + '_n']:
+                continue
+            s = stats.setdefault(col, {'n': 0, 'min': r[col + '_min'], 'max': r[col + '_max'], 'sum': 0.0})
+            s['n'] += r[col + '_n']
+            s['min'] = min(s['min'], r[col + '_min'])
+            s['max'] = max(s['max'], r[col + '_max'])
+            s['sum'] += r[col + '_sum']
+    return total, stats
+
+
+def longest_streak(rows, predicate):
+    """(length, first date, last date) of the longest run of consecutive days matching predicate."""
+    best = (0, None, None)
+    length, first, prev = 0, None, None
+    for r in rows:
+        day = datetime.date.fromisoformat(r['run_date'])
+        if predicate(r) and length and prev == day - datetime.timedelta(days=1):
+            length += 1
+        elif predicate(r):
+            length, first = 1, day
+        else:
+            length = 0
+        if length > best[0]:
+            best = (length, first, day)
+        prev = day
+    return best
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Query the judgment run history")
+    parser.add_argument('--db', default=None, help='history database (default data/history.db)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('months', 'count', 'stats', 'streak'):
+        p = sub.add_parser(name)
+        p.add_argument('--from', dest='start', default='0001-01-01')
+        p.add_argument('--to', dest='end', default='9999-12-30')
+        if name == 'count':
+            p.add_argument('--level', type=int, required=True, choices=[0, 1, 2])
+        if name == 'streak':
+            kind = p.add_mutually_exclusive_group(required=True)
+            kind.add_argument('--dry', action='store_true', help='days with p3d <= 1.0 mm')
+            kind.add_argument('--min-level', type=int, choices=[1, 2], help='days at or above this level')
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db) if args.db else HistoryStore()
+    try:
+        if args.command == 'streak':
+            if args.dry:
+                predicate, label = (lambda r: r['p3d'] is not None and r['p3d'] <= 1.0), "p3d <= 1.0mm"
+            else:
+                predicate, label = (lambda r: r['level'] >= args.min_level), f"level >= {args.min_level}"
+            length, first, last = longest_streak(store.daily(args.start, args.end), predicate)
+            if length:
+                print(f"Longest streak ({label}): {length} days, {first} - {last}")
+            else:
+                print(f"No days with {label}")
+            return
+
+        rows = store.month_summaries(args.start, args.end)
+        if args.command == 'months':
+            print(f"{'month':<9}{'days':>5}{'lv0':>5}{'lv1':>5}{'lv2':>5}")
+            for r in rows:
+                print(f"{r['month']:<9}{r['days']:>5}{r['level0']:>5}{r['level1']:>5}{r['level2']:>5}")
+            return
+
+        total, stats = combine(rows)
+        if args.command == 'count':
+            print(f"level {args.level}: {total['level%d' % args.level]} of {total['days']} days")
+        else:
+            print(f"days: {total['days']} (level0 {total['level0']}, level1 {total['level1']}, level2 {total['level2']})")
+            for col in ('p3d', 'p30d'):
+                s = stats.get(col)
+                if s:
+                    print(f"{col}: min {s['min']:.1f} / max {s['max']:.1f} / mean {s['sum'] / s['n']:.1f} mm ({s['n']} days)")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import datetime
+import hashlib
+import json
+import os
+
+import atomic_io
+
+# Month-sharded history for the docs/ dashboard.
+#
+#   docs/history/manifest.json   months (file, day count, level counts) + weekly aggregates
+#   docs/history/YYYY-MM.json    every run of the month + one daily point per day
+#
+# A trend view loads the manifest and only the shards of the months it shows.
+# Each update rewrites the current month's shard and the manifest; an older shard is
+# only rewritten when its rows changed (e.g. after a backdated upsert).
+
+SHARD_DIR = "docs/history"
+MANIFEST_VERSION = 1
+
+
+def _write_json(path, payload):
+    atomic_io.write_if_changed(path, json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+
+
+def _flag(value):
+    # NULL (the advisories could not be checked) stays null in the shard
+    return None if value is None else bool(value)
+
+
+def _month_bounds(month):
+    return month + '-01', month + '-31'
+
+
+def _signature(store, summary):
+    start, end = _month_bounds(summary['month'])
+    count, max_id = store.conn.execute(
+        "SELECT COUNT(*), MAX(id) FROM runs WHERE run_date BETWEEN ? AND ?", (start, end)).fetchone()
+    raw = json.dumps([list(summary), count, max_id])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def _shard(store, month):
+    start, end = _month_bounds(month)
+    runs = [[r['run_date'], r['run_time'], r['level'], r['p3d'], r['p30d'], _flag(r['is_dry']), _flag(r['is_strong_wind'])]
+            for r in store.between(start, end)]
+    daily = [[r['run_date'], r['level'], r['p3d'], r['p30d'], _flag(r['is_dry']), _flag(r['is_strong_wind'])]
+             for r in store.daily(start, end)]
+    return {
+        'month': month,
+        'columns': {'runs': ['date', 'time', 'level', 'p3d', 'p30d', 'is_dry', 'is_strong_wind'],
+                    'daily': ['date', 'level', 'p3d', 'p30d', 'is_dry', 'is_strong_wind']},
+        'runs': runs,
+        'daily': daily,
+    }
+
+
+def _weeks(store, start, end):
+    """Weekly aggregates (weeks starting Monday) over the daily rows of start..end."""
+    weeks = {}
+    for r in store.daily(start, end):
+        day = datetime.date.fromisoformat(r['run_date'])
+        week = (day - datetime.timedelta(days=day.weekday())).isoformat()
+        w = weeks.setdefault(week, {'week': week, 'days': 0, 'max_level': 0, 'p3d': [], 'p30d': []})
+        w['days'] += 1
+        w['max_level'] = max(w['max_level'], r['level'])
+        for col in ('p3d', 'p30d'):
+            if r[col] is not None:
+                w[col].append(r[col])
+    out = []
+    for w in weeks.values():
+        out.append([w['week'], w['days'], w['max_level'],
+                    round(sum(w['p3d']) / len(w['p3d']), 1) if w['p3d'] else None,
+                    round(sum(w['p30d']) / len(w['p30d']), 1) if w['p30d'] else None])
+    return out
+
+
+def update(store, current_month, shard_dir=SHARD_DIR):
+    """Brings docs/history up to date with the store; returns the months rewritten."""
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest_path = os.path.join(shard_dir, 'manifest.json')
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            manifest = None
+    except (OSError, ValueError):
+        manifest = None
+    known = {m['month']: m for m in manifest['months']} if manifest else {}
+
+    months = []
+    rewritten = []
+    for summary in store.conn.execute("SELECT * FROM month_summary ORDER BY month"):
+        month = summary['month']
+        file_name = f"{month}.json"
+        sig = _signature(store, summary)
+        old = known.get(month)
+        if month == current_month or old is None or old.get('sig') != sig \
+                or not os.path.exists(os.path.join(shard_dir, file_name)):
+            _write_json(os.path.join(shard_dir, file_name), _shard(store, month))
+            rewritten.append(month)
+        months.append({
+            'month': month, 'file': file_name, 'days': summary['days'],
+            'levels': [summary['level0'], summary['level1'], summary['level2']], 'sig': sig,
+        })
+
+    # Weekly aggregates: keep the weeks untouched by rewritten months, recompute the rest
+    weekly = manifest['weekly'] if manifest else []
+    if rewritten:
+        first = datetime.date.fromisoformat(rewritten[0] + '-01')
+        first_week = (first - datetime.timedelta(days=first.weekday())).isoformat()
+        weekly = [w for w in weekly if w[0] < first_week] + _weeks(store, first_week, '9999-12-31')
+
+    _write_json(manifest_path, {
+        'version': MANIFEST_VERSION,
+        'months': months,
+        'weekly_columns': ['week', 'days', 'max_level', 'p3d_mean', 'p30d_mean'],
+        'weekly': weekly,
+    })
+    return rewritten
@@ -0,0 +1,269 @@
+import csv
+import datetime
+import os
+import sqlite3
+
+# Run history in SQLite (data/history.db) instead of appending to data/history.csv.
+# Runs are keyed by (run date, JMA reportDatetime), so re-running the job against the
+# same report updates the row instead of adding a duplicate; a run that could not read
+# the report time is stored with '' (not NULL, which never conflicts), so reruns of such
+# a day replace each other too. Rows imported from the legacy CSV keep NULL and stay
+# distinct. The schema version lives in PRAGMA user_version; MIGRATIONS[i] upgrades
+# version i to i + 1.
+# month_summary holds per-month level counts and p3d/p30d aggregates, refreshed on
+# every upsert, so whole-history statistics read one row per month.
+# data/history.csv is still written as a normalized export for compatibility.
+
+DB_FILE = "data/history.db"
+LEGACY_CSV = "data/history.csv"
+CSV_COLUMNS = ['date', 'time', 'report_time', 'level', 'p3d', 'p30d', 'is_dry', 'is_strong_wind', 'result_text', 'source']
+RESULT_TEXTS = {0: "該当なし", 1: "注意レベル", 2: "警報レベル"}
+
+
+def _create_schema(conn, legacy_csv=None):
+    conn.executescript("""
+        CREATE TABLE runs (
+            id INTEGER PRIMARY KEY,
+            run_date TEXT NOT NULL,
+            run_time TEXT,
+            report_time TEXT,
+            level INTEGER NOT NULL,
+            p3d REAL,
+            p30d REAL,
+            is_dry INTEGER NOT NULL,
+            is_strong_wind INTEGER NOT NULL,
+            result_text TEXT,
+            source TEXT
+        );
+        -- Legacy rows have no report_time; NULLs never conflict, so they all stay
+        CREATE UNIQUE INDEX runs_by_report ON runs (run_date, report_time);
+        CREATE INDEX runs_by_date_time ON runs (run_date, run_time);
+    """)
+    if legacy_csv and os.path.exists(legacy_csv):
+        conn.executemany(_INSERT, _legacy_rows(legacy_csv))
+
+
+# Per-day view: the last run of each date is the one that counts
+_DAILY_VIEW = """
+    CREATE VIEW daily AS
+    SELECT * FROM runs r
+    WHERE r.id = (SELECT id FROM runs WHERE run_date = r.run_date ORDER BY run_time DESC, id DESC LIMIT 1)
+"""
+
+_MONTH_SUMMARY = """
+    SELECT substr(run_date, 1, 7) AS month, COUNT(*) AS days,
+           SUM(level = 0) AS level0, SUM(level = 1) AS level1, SUM(level = 2) AS level2,
+           COUNT(p3d) AS p3d_n, MIN(p3d) AS p3d_min, MAX(p3d) AS p3d_max, SUM(p3d) AS p3d_sum,
+           COUNT(p30d) AS p30d_n, MIN(p30d) AS p30d_min, MAX(p30d) AS p30d_max, SUM(p30d) AS p30d_sum
+    FROM daily WHERE run_date BETWEEN ? AND ? GROUP BY month
+"""
+
+
+def _add_month_summary(conn):
+    conn.execute(_DAILY_VIEW)
+    conn.execute("""
+        CREATE TABLE month_summary (
+            month TEXT PRIMARY KEY, days INTEGER, level0 INTEGER, level1 INTEGER, level2 INTEGER,
+            p3d_n INTEGER, p3d_min REAL, p3d_max REAL, p3d_sum REAL,
+            p30d_n INTEGER, p30d_min REAL, p30d_max REAL, p30d_sum REAL
+        )
+    """)
+    conn.execute("INSERT INTO month_summary " + _MONTH_SUMMARY, ('0000-00-00', '9999-99-99'))
+
+
+def _nullable_flags(conn):
+    # is_dry / is_strong_wind were NOT NULL, so an unknown advisory had been stored as 0.
+    # SQLite cannot drop a constraint in place; the table is rebuilt with the same ids.
+    conn.execute("DROP VIEW daily")
+    conn.execute("ALTER TABLE runs RENAME TO runs_old")
+    conn.execute("DROP INDEX runs_by_report")
+    conn.execute("DROP INDEX runs_by_date_time")
+    conn.execute("""
+        CREATE TABLE runs (
+            id INTEGER PRIMARY KEY,
+            run_date TEXT NOT NULL,
+            run_time TEXT,
+            report_time TEXT,
+            level INTEGER NOT NULL,
+            p3d REAL,
+            p30d REAL,
+            is_dry INTEGER,
+            is_strong_wind INTEGER,
+            result_text TEXT,
+            source TEXT
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX runs_by_report ON runs (run_date, report_time)")
+    conn.execute("CREATE INDEX runs_by_date_time ON runs (run_date, run_time)")
+    conn.execute("INSERT INTO runs SELECT * FROM runs_old")
+    conn.execute("DROP TABLE runs_old")
+    conn.execute(_DAILY_VIEW)
+
+
+MIGRATIONS = [_create_schema, _add_month_summary, _nullable_flags]
+
+_INSERT = """
+    INSERT INTO runs (run_date, run_time, report_time, level, p3d, p30d, is_dry, is_strong_wind, result_text, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _bool(text):
+    # 'なし' slipped into the is_strong_wind column once; blank is an unknown (NULL) flag
+    if not text.strip():
+        return None
+    return 1 if text.strip() in ('True', 'true', '1', 'あり') else 0
+
+
+def _flag(value):
+    # None is an advisory that could not be checked; it stays NULL rather than "not issued"
+    return None if value is None else int(bool(value))
+
+
+def _csv_flag(value):
+    return '' if value is None else bool(value)
+
+
+def _float(text):
+    return float(text) if text.strip() else None
+
+
+def _legacy_rows(path):
+    """Normalizes the 6, 8 and 9 column layouts of history.csv and drops exact duplicates."""
+    seen = set()
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if not row or row[0] == 'date':
+                continue
+            if len(row) == 6:
+                date, level, p3d, p30d, dry, wind = row
+                time = result_text = source = None
+            elif len(row) in (8, 9):
+                date, time, level, p3d, p30d, dry, wind, result_text = row[:8]
+                source = row[8] if len(row) == 9 else None
+            elif len(row) == len(CSV_COLUMNS):
+                # Already in export layout
+                date, time, _, level, p3d, p30d, dry, wind, result_text, source = row
+            else:
+                print(f"Skipping history row with {len(row)} columns: {row}")
+                continue
+            level = int(level)
+            normalized = (date, time or None, None, level, _float(p3d), _float(p30d), _bool(dry), _bool(wind),
+                          result_text or RESULT_TEXTS.get(level), source or None)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            yield normalized
+
+
+def _next_month(month):
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + 1}-01" if mon == 12 else f"{year}-{mon + 1:02d}"
+
+
+def _prev_month(month):
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year - 1}-12" if mon == 1 else f"{year}-{mon - 1:02d}"
+
+
+def _next_day(date):
+    return (datetime.date.fromisoformat(date) + datetime.timedelta(days=1)).isoformat()
+
+
+class HistoryStore:
+    def __init__(self, path=DB_FILE, legacy_csv=None):
+        """legacy_csv seeds a newly created DB; only the default DB is seeded from data/history.csv."""
+        self.path = path
+        self.legacy_csv = legacy_csv if legacy_csv is not None else (LEGACY_CSV if path == DB_FILE else None)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for i in range(version, len(MIGRATIONS)):
+            with self.conn:
+                if i == 0:
+                    # A new DB: the schema, seeded from the legacy CSV if there is one
+                    _create_schema(self.conn, self.legacy_csv)
+                else:
+                    MIGRATIONS[i](self.conn)
+                self.conn.execute(f"PRAGMA user_version = {i + 1}")
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, run_date, run_time, report_time, level, p3d, p30d, is_dry, is_strong_wind, result_text, source):
+        """Returns whether the history changed.
+
+        A rerun that reproduces the stored row leaves it alone, first run_time included, so
+        an unchanged judgment does not rewrite data/history.db.
+        """
+        with self.conn:
+            cur = self.conn.execute(_INSERT + """
+                ON CONFLICT (run_date, report_time) DO UPDATE SET
+                    run_time = excluded.run_time, level = excluded.level, p3d = excluded.p3d,
+                    p30d = excluded.p30d, is_dry = excluded.is_dry, is_strong_wind = excluded.is_strong_wind,
+                    result_text = excluded.result_text, source = excluded.source
+                WHERE (level, p3d, p30d, is_dry, is_strong_wind, result_text, source) IS NOT
+                      (excluded.level, excluded.p3d, excluded.p30d, excluded.is_dry,
+                       excluded.is_strong_wind, excluded.result_text, excluded.source)
+            """, (run_date, run_time, report_time or '', level, p3d, p30d,
+                  _flag(is_dry), _flag(is_strong_wind), result_text, source))
+            if not cur.rowcount:
+                return False
+            self._refresh_month(run_date[:7])
+        return True
+
+    def _refresh_month(self, month):
+        self.conn.execute("DELETE FROM month_summary WHERE month = ?", (month,))
+        self.conn.execute("INSERT INTO month_summary " + _MONTH_SUMMARY, (month + '-01', month + '-31'))
+
+    def daily(self, start, end):
+        """Cursor over the last run of each day in start..end, oldest first."""
+        return self.conn.execute(
+            "SELECT * FROM daily WHERE run_date BETWEEN ? AND ? ORDER BY run_date", (start, end))
+
+    def month_summaries(self, start, end):
+        """Per-month aggregates for start..end (ISO dates).
+
+        Months wholly inside the range come from the precomputed month_summary table;
+        only the partial months at either edge are aggregated from their daily rows.
+        """
+        first_full = start[:7] if start.endswith('-01') else _next_month(start[:7])
+        last_full = end[:7] if _next_month(end[:7]) + '-01' == _next_day(end) else _prev_month(end[:7])
+        rows = []
+        if start[:7] < first_full:
+            rows += self.conn.execute(_MONTH_SUMMARY, (start, min(end, start[:7] + '-31'))).fetchall()
+        if first_full <= last_full:
+            rows += self.conn.execute(
+                "SELECT * FROM month_summary WHERE month BETWEEN ? AND ? ORDER BY month",
+                (first_full, last_full)).fetchall()
+        if last_full < end[:7] and (not rows or rows[-1]['month'] != end[:7]):
+            rows += self.conn.execute(_MONTH_SUMMARY, (max(start, end[:7] + '-01'), end)).fetchall()
+        return rows
+
+    def latest(self, n=1):
+        """The n most recent runs, newest first."""
+        return self.conn.execute(
+            "SELECT * FROM runs ORDER BY run_date DESC, run_time DESC LIMIT ?", (n,)).fetchall()
+
+    def between(self, start, end):
+        """Runs with start <= run_date <= end (ISO dates), oldest first."""
+        return self.conn.execute(
+            "SELECT * FROM runs WHERE run_date BETWEEN ? AND ? ORDER BY run_date, run_time",
+            (start, end)).fetchall()
+
+    def export_csv(self, path=LEGACY_CSV):
+        tmp = path + '.tmp'
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for r in self.conn.execute("SELECT * FROM runs ORDER BY run_date, run_time, id"):
+                writer.writerow([
+                    r['run_date'], r['run_time'] or '', r['report_time'] or '', r['level'],
+                    '' if r['p3d'] is None else r['p3d'], '' if r['p30d'] is None else r['p30d'],
+                    _csv_flag(r['is_dry']), _csv_flag(r['is_strong_wind']), r['result_text'] or '', r['source'] or '',
+                ])
+        os.replace(tmp, path)
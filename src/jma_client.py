@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import metrics
+
+# Shared HTTP client for every JMA endpoint.
+# One pooled keep-alive session, compressed transfer, and ETag / If-Modified-Since
+# revalidation so an unchanged page costs a 304 instead of a full body.
+
+CACHE_DIR = "data/cache/http"
+USER_AGENT = "Mozilla/5.0"
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept-Encoding": "gzip, deflate",
+            })
+            _session = session
+    return _session
+
+
+def get(url, timeout=10, headers=None, revalidate=True, stream=False):
+    """GET url through the shared session.
+
+    With revalidate=True the last ETag / Last-Modified seen for url is sent back,
+    and a 304 is answered from the stored body. The returned response then has
+    from_cache set to True. A streamed body may be abandoned part-way, so it is
+    never stored and stream=True implies revalidate=False.
+    """
+    if stream:
+        revalidate = False
+    req_headers = dict(headers or {})
+    entry = _load_entry(url) if revalidate else None
+    if entry:
+        if entry.get("etag"):
+            req_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            req_headers["If-Modified-Since"] = entry["last_modified"]
+
+    # A streamed body is read (and its bytes counted) by the caller
+    with metrics.stage("http", url=url, stream=stream) as rec:
+        resp = get_session().get(url, headers=req_headers, timeout=timeout, stream=stream)
+        rec['status'] = resp.status_code
+        if not stream:
+            rec['bytes'] = len(resp.content)
+    if resp.status_code == 304 and entry:
+        cached = _response_from_entry(url, entry, resp)
+        if cached is not None:
+            metrics.count("http.not_modified")
+            return cached
+        # Body went missing on disk; fetch it again unconditionally
+        metrics.count("retries")
+        return get(url, timeout=timeout, headers=headers, revalidate=False)
+
+    resp.from_cache = False
+    if revalidate and resp.status_code == 200:
+        _store_entry(url, resp)
+    return resp
+
+
+def get_json(url, timeout=10, headers=None):
+    return get(url, timeout=timeout, headers=headers).json()
+
+
+def _cache_paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".json"), os.path.join(CACHE_DIR, key + ".body")
+
+
+def _load_entry(url):
+    meta_path, _ = _cache_paths(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_entry(url, resp):
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    meta_path, body_path = _cache_paths(url)
+    entry = {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "content_type": resp.headers.get("Content-Type"),
+    }
+    with _cache_lock:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(body_path, "wb") as f:
+            f.write(resp.content)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+
+
+def _response_from_entry(url, entry, not_modified):
+    _, body_path = _cache_paths(url)
+    try:
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except OSError:
+        return None
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp.request = not_modified.request
+    resp.headers = CaseInsensitiveDict()
+    if entry.get("content_type"):
+        resp.headers["Content-Type"] = entry["content_type"]
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp._content = body
+    resp._content_consumed = True
+    resp.from_cache = True
+    return resp
@@ -1,12 +1,27 @@
-import requests
+import area_index
+import precip_cache
+import precip_store
+import fetch_policy
+import history_shards
+import atomic_io
+import metrics
+import response_archive
+from history_store import HistoryStore
+from daily_table import extract_daily_precip, CHUNK_SIZE, FetchCancelled
+from warning_index import WarningIndex, DRY_CODE, WIND_CODES, is_sea_name
+from warning_stream import parse_warning_subset
 from bs4 import BeautifulSoup
 import datetime
 import json
-import csv
 import os
 import pytz
 import re
 import sys
+import tempfile
+import argparse
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants
 TARGET_STATION_NAME = "八幡"
@@ -14,187 +29,303 @@ TARGET_STATION_PREF = "82"
 TARGET_STATION_BLOCK = "0780"
 
 DATA_FILE = "docs/data.json"
+DATA_JS_FILE = "docs/data.js"
+# Per-run details (check time, report time), kept out of data.json so it only changes with
+# the judgment; not committed either, so an unchanged judgment leaves docs/ as it was
+META_FILE = "docs/meta.json"
+META_JS_FILE = "docs/meta.js"
+METRICS_FILE = "docs/metrics.json"
 HISTORY_FILE = "data/history.csv"
-TENKOU_URL = "https://www.data.jma.go.jp/stats/data/mdrr/tenkou/alltable/pre00.html"
-WARNING_JSON_URL = "https://www.jma.go.jp/bosai/warning/data/warning/400000.json"
+HISTORY_DB = "data/history.db"
+HISTORY_SHARD_DIR = "docs/history"
+# Stores of a run against a stand-in (set_base_url), so synthetic values never reach the real ones
+STUB_DIR = "data/cache/stub"
+DATA_BASE_URL = "https://www.data.jma.go.jp"
+BOSAI_BASE_URL = "https://www.jma.go.jp"
+DAILY_PATH = "/obd/stats/etrn/view/daily_{page_type}.php?prec_no={prec_no}&block_no={block_no}&year={year}&month={month}&day=&view=p1"
+TENKOU_PATH = "/stats/data/mdrr/tenkou/alltable/pre00.html"
+WARNING_JSON_PATH = "/bosai/warning/data/warning/400000.json"
+DAILY_URL_TEMPLATE = DATA_BASE_URL + DAILY_PATH
+TENKOU_URL = DATA_BASE_URL + TENKOU_PATH
+WARNING_JSON_URL = BOSAI_BASE_URL + WARNING_JSON_PATH
 AREA_CODE_KITAKYUSHU_REGION = "4010000"
+# p3d sources, best first: (label, prec_no, block_no, page_type)
+P3D_SOURCES = [
+    ("八幡", "82", "0780", "a1"),
+    ("福岡(代替)", "82", "47807", "s1"),
+]
 
-def get_confirmed_3day_precip():
-    today = datetime.datetime.now(pytz.timezone('Asia/Tokyo')).date()
+PRECIP_CACHE = precip_cache.PrecipCache()
+PRECIP_STORE_DIR = precip_store.STORE_DIR
+JST = pytz.timezone('Asia/Tokyo')
+
+def set_base_url(base_url):
+    """Sends every JMA request to base_url (e.g. bench/jma_stub.py) instead of the live hosts."""
+    global DAILY_URL_TEMPLATE, TENKOU_URL, WARNING_JSON_URL, PRECIP_CACHE, PRECIP_STORE_DIR
+    global HISTORY_DB, HISTORY_FILE, HISTORY_SHARD_DIR, METRICS_FILE
+    global DATA_FILE, DATA_JS_FILE, META_FILE, META_JS_FILE
+    base_url = base_url.rstrip('/')
+    DAILY_URL_TEMPLATE = base_url + DAILY_PATH
+    TENKOU_URL = base_url + TENKOU_PATH
+    WARNING_JSON_URL = base_url + WARNING_JSON_PATH
+    # Nothing learnt from the stand-in may answer for, or be published as, the live site:
+    # the published files, caches, stores, history and breaker state all move under STUB_DIR
+    DATA_FILE = os.path.join(STUB_DIR, "data.json")
+    DATA_JS_FILE = os.path.join(STUB_DIR, "data.js")
+    META_FILE = os.path.join(STUB_DIR, "meta.json")
+    META_JS_FILE = os.path.join(STUB_DIR, "meta.js")
+    PRECIP_CACHE = precip_cache.PrecipCache(path=os.path.join(STUB_DIR, "precip_months.json"))
+    PRECIP_STORE_DIR = os.path.join(STUB_DIR, "precip")
+    HISTORY_DB = os.path.join(STUB_DIR, "history.db")
+    HISTORY_FILE = os.path.join(STUB_DIR, "history.csv")
+    HISTORY_SHARD_DIR = os.path.join(STUB_DIR, "history")
+    METRICS_FILE = os.path.join(STUB_DIR, "metrics.json")
+    response_archive.ARCHIVE = response_archive.Archive(os.path.join(STUB_DIR, "archive"))
+    fetch_policy.BREAKERS = fetch_policy.Breakers(os.path.join(STUB_DIR, "breakers.json"))
+
+def now_jst():
+    """The current JST time, or the replayed moment in --replay mode."""
+    return response_archive.replay_at or datetime.datetime.now(JST)
+
+if os.environ.get("JMA_BASE_URL"):
+    set_base_url(os.environ["JMA_BASE_URL"])
+# One in-flight download per month page; concurrent callers wait and then hit the cache
+_month_locks = {}
+_month_locks_guard = threading.Lock()
+
+def get_confirmed_3day_precip(concurrent=True):
+    today = now_jst().date()
     yesterday = today - datetime.timedelta(days=1)
     target_dates = [yesterday, yesterday - datetime.timedelta(days=1), yesterday - datetime.timedelta(days=2)]
-    
-    total, map_data, success = fetch_precip_from_jma(target_dates, '82', '0780', 'a1')
-    if success:
-        return total, "八幡"
-    else:
-        total_f, map_f, success_f = fetch_precip_from_jma(target_dates, '82', '47807', 's1')
-        if success_f:
-            return total_f, "福岡(代替)"
-        return 0.0, "取得失敗"
 
-def fetch_precip_from_jma(target_dates, prec_no, block_no, page_type='a1'):
+    if not concurrent:
+        for i, (label, prec_no, block_no, page_type) in enumerate(P3D_SOURCES):
+            total, _, success = fetch_precip_from_jma(target_dates, prec_no, block_no, page_type, concurrent=False)
+            if success:
+                if i: metrics.count("fallback.p3d")
+                return total, label
+        metrics.count("failure.p3d")
+        return None, "取得失敗"
+
+    # Every source is asked at once so a failing primary costs no extra round trip.
+    # Results are taken in priority order; once one has data the rest are cancelled
+    # and not waited for, so a hung fallback cannot hold up the run.
+    cancels = [threading.Event() for _ in P3D_SOURCES]
+    pool = ThreadPoolExecutor(max_workers=len(P3D_SOURCES))
+    try:
+        futures = [pool.submit(fetch_precip_from_jma, target_dates, prec_no, block_no, page_type, True, cancel)
+                   for (_, prec_no, block_no, page_type), cancel in zip(P3D_SOURCES, cancels)]
+        for i, (future, (label, *_)) in enumerate(zip(futures, P3D_SOURCES)):
+            total, _, success = future.result()
+            if success:
+                if i: metrics.count("fallback.p3d")
+                return total, label
+    finally:
+        for cancel in cancels:
+            cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    metrics.count("failure.p3d")
+    return None, "取得失敗"
+
+def fetch_precip_from_jma(target_dates, prec_no, block_no, page_type='a1', concurrent=True, cancel=None):
     months_needed = sorted(list(set([(d.year, d.month) for d in target_dates])), reverse=True)
     daily_precip_map = {}
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    data_found = False
-    
-    for year, month in months_needed:
-        url = f"https://www.data.jma.go.jp/obd/stats/etrn/view/daily_{page_type}.php?prec_no={prec_no}&block_no={block_no}&year={year}&month={month}&day=&view=p1"
-        try:
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.encoding = 'shift_jis'
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            rows = soup.find_all('tr', class_='mtx')
-            if not rows: continue
-
-            for row in rows:
-                cols = row.find_all('td')
-                if not cols: continue
-                try:
-                    d_text = cols[0].text.strip()
-                    if not d_text.isdigit(): continue
-                    d_day = int(d_text)
-                    val = 0.0
-                    col_idx = 1 if page_type == 'a1' else 3
-                    if len(cols) > col_idx:
-                        d_val_text = cols[col_idx].text.strip()
-                        if d_val_text in ["--", "///", "0.0)"]:
-                            val = 0.0
-                        else:
-                            clean = re.sub(r'[^\d\.]', '', d_val_text)
-                            if clean: val = float(clean)
-                    daily_precip_map[datetime.date(year, month, d_day)] = val
-                    data_found = True
-                except: continue
-        except: continue
-            
-    total = sum(daily_precip_map.get(d, 0.0) for d in target_dates)
+
+    def month_days(year, month):
+        return [d.day for d in target_dates if (d.year, d.month) == (year, month)]
+
+    # Month pages are independent, so request them all at once
+    if concurrent and len(months_needed) > 1:
+        with ThreadPoolExecutor(max_workers=len(months_needed)) as pool:
+            results = list(pool.map(lambda ym: fetch_month_precip(prec_no, block_no, page_type, *ym, days=month_days(*ym), cancel=cancel), months_needed))
+    else:
+        results = [fetch_month_precip(prec_no, block_no, page_type, y, m, days=month_days(y, m), cancel=cancel) for y, m in months_needed]
+
+    for month_map in results:
+        if month_map:
+            daily_precip_map.update(month_map)
+
+    # A day the page did not give is unknown, not 0 mm: the source only counts with every day
+    data_found = all(d in daily_precip_map for d in target_dates)
+    total = sum(daily_precip_map[d] for d in target_dates) if data_found else None
     return total, daily_precip_map, data_found
 
+def fetch_month_precip(prec_no, block_no, page_type, year, month, days=None, cancel=None):
+    with _month_locks_guard:
+        lock = _month_locks.setdefault((prec_no, block_no, page_type, year, month), threading.Lock())
+    with lock:
+        return _fetch_month_precip(prec_no, block_no, page_type, year, month, days, cancel)
+
+def _fetch_month_precip(prec_no, block_no, page_type, year, month, days, cancel=None):
+    cached = PRECIP_CACHE.get(prec_no, block_no, page_type, year, month, days)
+    if cached is not None:
+        metrics.count("cache.month_hit")
+        return cached
+
+    url = DAILY_URL_TEMPLATE.format(page_type=page_type, prec_no=prec_no, block_no=block_no, year=year, month=month)
+    month_map = {}
+    try:
+        if cancel is not None and cancel.is_set():
+            raise FetchCancelled()
+        # Stream the page and stop reading once the wanted days are in
+        resp = fetch_policy.get(url, timeout=10, cancel=cancel, stream=True)
+        try:
+            with metrics.stage("parse.daily_table", url=url, bytes=0) as rec:
+                read = []
+                def counted(chunks):
+                    for chunk in chunks:
+                        # A slow trickle must not outlive the run deadline
+                        fetch_policy.check_deadline()
+                        rec['bytes'] += len(chunk)
+                        read.append(chunk)
+                        yield chunk
+                    rec['complete'] = True
+                values = extract_daily_precip(counted(resp.iter_content(CHUNK_SIZE)), page_type, days, cancel=cancel)
+                rec['rows'] = len(values)
+        finally:
+            resp.close()
+        response_archive.record(url, b"".join(read), resp.headers.get('Content-Type'), partial=not rec.get('complete'))
+        month_map = {datetime.date(year, month, d): v for d, v in values.items()}
+    except (FetchCancelled, fetch_policy.Cancelled):
+        # A higher-priority source already answered; nothing partial goes into the cache
+        metrics.count("cancelled.month_fetch")
+        return {}
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+    PRECIP_CACHE.put(prec_no, block_no, page_type, year, month, month_map)
+    return month_map
+
+def get_30day_precip(concurrent=True):
+    """Confirmed 30-day total from the local daily store, or the preliminary tenkou value."""
+    p30d = get_confirmed_30day_precip(concurrent)
+    if p30d is not None:
+        return p30d, f"{TARGET_STATION_NAME}確定値"
+    metrics.count("fallback.p30d_preliminary")
+    p30d = get_preliminary_30day_precip()
+    if p30d is None:
+        return None, "取得失敗"
+    return p30d, f"推定値({TARGET_STATION_NAME})"
+
+def get_confirmed_30day_precip(concurrent=True):
+    yesterday = now_jst().date() - datetime.timedelta(days=1)
+    store = precip_store.DailySeriesStore(TARGET_STATION_PREF, TARGET_STATION_BLOCK, PRECIP_STORE_DIR)
+    missing = store.missing_days(yesterday)
+    if missing:
+        _, daily_map, _ = fetch_precip_from_jma(missing, TARGET_STATION_PREF, TARGET_STATION_BLOCK, 'a1', concurrent=concurrent)
+        for d in missing:
+            # Stop at the first day JMA has not confirmed yet
+            if d not in daily_map: break
+            store.append(d, daily_map[d])
+        store.save()
+    totals = store.totals(yesterday)
+    return totals[1] if totals else None
+
 def get_preliminary_30day_precip():
     try:
-        resp = requests.get(TENKOU_URL, timeout=15)
+        resp = fetch_policy.get(TENKOU_URL, timeout=15)
         resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        
-        # Determine the column index for "前30日間合計"
-        # In pre00.html, columns are:
-        # 0:Pref, 1:Station, 2:10d_val, 3:10d_ratio, 4:20d_val, 5:20d_ratio, 6:30d_val, 7:30d_ratio...
-        # 30d value is at index 6.
-        target_col_idx = 6
-        
-        current_pref = ""
-        for row in soup.find_all('tr'):
-            cols = row.find_all(['th', 'td'])
-            txts = [c.get_text(strip=True) for c in cols]
-            if len(txts) < 2: continue
-            
-            # Update current prefecture name (it's only in the first row of each pref)
-            if txts[0]:
-                current_pref = txts[0]
-            
-            # Check station name and prefecture
-            if txts[1] == "八幡" and "福岡" in current_pref:
-                if len(txts) > target_col_idx:
-                    # Remove non-numeric characters (like ')', '*', etc.)
-                    clean = re.sub(r'[^0-9.]', '', txts[target_col_idx])
-                    if clean: return float(clean)
-                break
-        return 0.0
+        with metrics.stage("parse.pre00", bytes=len(resp.content)):
+            p30d = parse_preliminary_30day(resp.text)
     except Exception as e:
+        metrics.count("failure.p30d_preliminary")
         print(f"Error getting preliminary precip: {e}")
-        return 0.0
+        return None
+    if p30d is None:
+        metrics.count("failure.p30d_preliminary")
+        print(f"No 30-day total for {TARGET_STATION_NAME} in pre00.html")
+    return p30d
+
+def parse_preliminary_30day(html, station=TARGET_STATION_NAME, pref="福岡"):
+    """30-day total for station from the pre00.html table, None if it is not listed.
+
+    A missing row (layout change, truncated body) is unknown, not 0 mm: 0 would read as dry.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Determine the column index for "前30日間合計"
+    # In pre00.html, columns are:
+    # 0:Pref, 1:Station, 2:10d_val, 3:10d_ratio, 4:20d_val, 5:20d_ratio, 6:30d_val, 7:30d_ratio...
+    # 30d value is at index 6.
+    target_col_idx = 6
+
+    current_pref = ""
+    for row in soup.find_all('tr'):
+        cols = row.find_all(['th', 'td'])
+        txts = [c.get_text(strip=True) for c in cols]
+        if len(txts) < 2: continue
+
+        # Update current prefecture name (it's only in the first row of each pref)
+        if txts[0]:
+            current_pref = txts[0]
+
+        # Check station name and prefecture
+        if txts[1] == station and pref in current_pref:
+            if len(txts) > target_col_idx:
+                # Remove non-numeric characters (like ')', '*', etc.)
+                clean = re.sub(r'[^0-9.]', '', txts[target_col_idx])
+                if clean: return float(clean)
+            break
+    return None
 
 def get_advisories():
+    try:
+        # no-cache makes intermediaries revalidate; an unchanged file comes back as a 304
+        resp = fetch_policy.get(WARNING_JSON_URL, timeout=10, headers={'Cache-Control': 'no-cache'})
+        with metrics.stage("parse.warning", bytes=len(resp.content)):
+            data = load_warning_document(resp.content.decode('utf-8'), [AREA_CODE_KITAKYUSHU_REGION])
+    except Exception as e:
+        metrics.count("failure.advisories")
+        print(f"Error checking advisories: {e}")
+        # Unknown, not "none issued"
+        return None, None, None, [], None
+    with metrics.stage("evaluate.advisories"):
+        return evaluate_advisories(data)
+
+def load_warning_document(text, area_codes):
+    """Only the given areas are materialized; an unexpected layout falls back to a full parse."""
+    try:
+        return parse_warning_subset(text, area_codes)
+    except ValueError as e:
+        metrics.count("fallback.warning_full_parse")
+        print(f"Selective warning parse failed ({e}), parsing the whole document")
+        return json.loads(text)
+
+def evaluate_advisories(data):
     is_dry = False
     is_strong_wind_land = False
     wind_locations = []
-    
-    # 海上エリアのコード (響灘: 4010001, 瀬戸内側: 4010002)
-    SEA_AREA_CODES = ["4010001", "4010002"]
+    report_datetime = data.get('reportDatetime')
+    area = AREA_CODE_KITAKYUSHU_REGION
 
     try:
-        url = f"{WARNING_JSON_URL}?_={int(datetime.datetime.now().timestamp())}"
-        data = requests.get(url, timeout=10).json()
-        
+        index = WarningIndex(data)
+
         # 1. Check Top-Level AreaTypes (Most reliable for "Issued" status)
         # 4010000 is Kitakyushu Region
-        if 'areaTypes' in data:
-            for at in data['areaTypes']:
-                for a in at.get('areas', []):
-                    if a.get('code') == AREA_CODE_KITAKYUSHU_REGION:
-                        for w in a.get('warnings', []):
-                            code = w.get('code')
-                            status = w.get('status')
-                            
-                            # 乾燥注意報 (21)
-                            if code == '21' and status in ['発表', '継続']:
-                                is_dry = True
-                            
-                            # 強風注意報 (15, 06, or 04 depending on context)
-                            if code in ['06', '15', '04'] and status in ['発表', '継続']:
-                                # Flag as potentially active. We will refine by land/sea/location below or defaults to True 
-                                # if we can't determine specific locations.
-                                # Defaulting to True here to ensure it's not missed.
-                                is_strong_wind_land = True 
+        is_dry = index.has_active(area, [DRY_CODE])
+        # Flag wind as potentially active. We will refine by land/sea/location below or
+        # default to True if we can't determine specific locations, to ensure it's not missed.
+        is_strong_wind_land = index.has_active(area, WIND_CODES)
 
         # 2. Detailed location check from timeSeries
         # This helps identify if it is "Hibikinada" (Sea) vs "Kitakyushu City" (Land)
-        found_land_wind_in_ts = False
-        found_sea_wind_in_ts = False
-        
-        # Keywords to identify Sea areas by Name
-        sea_keywords = ["響灘", "瀬戸内", "周防灘", "海上"]
-
-        if 'timeSeries' in data:
-            for ts in data['timeSeries']:
-                for at in ts.get('areaTypes', []):
-                    for a in at.get('areas', []):
-                        if a.get('code') == AREA_CODE_KITAKYUSHU_REGION:
-                            for w in a.get('warnings', []):
-                                code = w.get('code')
-                                if code in ['06', '15', '04', '21']:
-                                    for level in w.get('levels', []):
-                                        for la in level.get('localAreas', []):
-                                            vals = la.get('values', [])
-                                            is_active_loc = False
-                                            for v in vals:
-                                                if v and v >= "10": 
-                                                    is_active_loc = True
-                                                    break
-                                            
-                                            if is_active_loc:
-                                                if code == '21':
-                                                    is_dry = True
-                                                
-                                                loc_code = la.get('localAreaCode')
-                                                loc_name = la.get('localAreaName', '')
-                                                if loc_name:
-                                                    wind_locations.append(loc_name)
-                                                
-                                                # Check Code first
-                                                is_sea_by_code = (loc_code and loc_code in SEA_AREA_CODES)
-                                                # Check Name
-                                                is_sea_by_name = any(k in loc_name for k in sea_keywords)
-
-                                                if is_sea_by_code or is_sea_by_name:
-                                                    found_sea_wind_in_ts = True
-                                                else:
-                                                    found_land_wind_in_ts = True
+        if index.active_local_areas(area, [DRY_CODE]):
+            is_dry = True
+
+        wind_rows = index.active_local_areas(area, WIND_CODES)
+        wind_locations = [row.name for row in wind_rows if row.name]
+        found_land_wind_in_ts = any(not row.is_sea for row in wind_rows)
 
         # Refine is_strong_wind_land based on details
-        if found_land_wind_in_ts or found_sea_wind_in_ts:
+        if wind_rows:
             # If we found specific sub-area info, use it
             is_strong_wind_land = found_land_wind_in_ts
-        elif is_strong_wind_land:
-            pass
 
         # 3. Fallback/Confirmation via Headline
-        headline = data.get('headlineText', '')
+        headline = index.headline
         if not is_strong_wind_land:
             if ("強風" in headline or "暴風" in headline) and "北九州" in headline:
-                if ("響灘" in headline or "瀬戸内" in headline or "海上" in headline) and "北九州市" not in headline and "陸上" not in headline:
+                if area_index.get().mentions_sea(headline, area) and "北九州市" not in headline and "陸上" not in headline:
                      pass # Likely Sea only
                 else:
                      is_strong_wind_land = True
@@ -207,18 +338,12 @@ def get_advisories():
         
         # Verify based on collected location names (Double Check)
         if wind_locations:
-            all_sea = True
-            for loc in wind_locations:
-                if not any(k in loc for k in sea_keywords):
-                    all_sea = False
-                    break
-            
-            if all_sea:
+            if all(is_sea_name(loc) for loc in wind_locations):
                 is_strong_wind_land = False
         else:
              # If no locations found but is_strong_wind_land is True, check headline for exclusive sea
              if is_strong_wind_land:
-                  if (("海上" in headline or "響灘" in headline or "瀬戸内" in headline) 
+                  if (area_index.get().mentions_sea(headline, area)
                       and "陸上" not in headline 
                       and "北九州市" not in headline):
                        is_strong_wind_land = False
@@ -233,34 +358,95 @@ def get_advisories():
         is_wind_issued = False
         is_strong_wind_land = False # Ensure this is also reset on error
         
-    return is_dry, is_wind_issued, is_strong_wind_land, wind_locations
+    return is_dry, is_wind_issued, is_strong_wind_land, wind_locations, report_datetime
+
+def fetch_inputs(concurrent=True):
+    """Runs the three JMA fetch stages, all at once unless concurrent is False."""
+    if not concurrent:
+        p3d, p3d_source = get_confirmed_3day_precip(concurrent=False)
+        p30d, p30d_source = get_30day_precip(concurrent=False)
+        advisories = get_advisories()
+        return p3d, p3d_source, p30d, p30d_source, advisories
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        f_p3d = pool.submit(get_confirmed_3day_precip)
+        f_p30d = pool.submit(get_30day_precip)
+        f_adv = pool.submit(get_advisories)
+        p3d, p3d_source = f_p3d.result()
+        p30d, p30d_source = f_p30d.result()
+        return p3d, p3d_source, p30d, p30d_source, f_adv.result()
 
-def main():
+def main(concurrent=True):
     sys.stdout.reconfigure(encoding='utf-8')
-    current_time = datetime.datetime.now(pytz.timezone('Asia/Tokyo'))
-    p3d, p3d_source = get_confirmed_3day_precip()
-    p30d = get_preliminary_30day_precip()
-    is_dry, is_wind_issued, is_wind_land, wind_locs = get_advisories()
-    
-    is_level1 = (p3d <= 1.0 and p30d <= 30.0) or (p3d <= 1.0 and is_dry)
-    level = 0
-    if is_level1:
-        level = 1
+    current_time = now_jst()
+    started = time.perf_counter()
+    fetch_policy.start_run()
+    inputs = fetch_inputs(concurrent)
+    print(f"Fetched JMA inputs in {time.perf_counter() - started:.2f}s ({'concurrent' if concurrent else 'sequential'})")
+    publish(current_time, *inputs)
+
+def replay(at, concurrent=True):
+    """Judges the inputs as they stood at `at`, answered from the response archive.
+
+    Nothing under docs/ or data/ is written; the result is printed and returned.
+    """
+    global PRECIP_CACHE, PRECIP_STORE_DIR
+    sys.stdout.reconfigure(encoding='utf-8')
+    response_archive.start_replay(at)
+    print(f"Replaying {at:%Y-%m-%d %H:%M} from {response_archive.ARCHIVE.directory}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # The daily store and month cache hold today's data; rebuild both from the archived pages
+        PRECIP_CACHE = precip_cache.PrecipCache(path=os.path.join(tmp, "precip_months.json"))
+        PRECIP_STORE_DIR = tmp
+        inputs = fetch_inputs(concurrent)
+    output = build_output(at, *inputs)
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+    return output
+
+def load_published():
+    """The judgment currently in docs/data.json, or None."""
+    try:
+        with open(DATA_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+RESULT_TEXTS = {0: "該当なし", 1: "注意レベル", 2: "警報レベル", None: "判定不能"}
+
+def judge(p3d, p30d, is_dry, is_wind_land):
+    """Level 0/1/2, or None when a missing input (None) could change the result."""
+    if p3d is None:
+        return None
+    if p3d > 1.0:
+        return 0
+    if (p30d is not None and p30d <= 30.0) or is_dry:
         # Upgrade to Level 2 ONLY if LAND wind is present
-        if is_wind_land: level = 2
-            
-    result_text = "警報レベル" if level == 2 else "注意レベル" if level == 1 else "該当なし"
+        if is_wind_land is None:
+            return None
+        return 2 if is_wind_land else 1
+    if p30d is None or is_dry is None:
+        return None
+    return 0
+
+def build_output(current_time, p3d, p3d_source, p30d, p30d_source, advisories):
+    """Judges the inputs; returns the docs/data.json dict."""
+    is_dry, is_wind_issued, is_wind_land, wind_locs, report_datetime = advisories
+
+    # Judgment starts only once every input is in
+    with metrics.stage("judge"):
+        level = judge(p3d, p30d, is_dry, is_wind_land)
+
+    result_text = RESULT_TEXTS[level]
     
     # Display "Present" if ANY wind warning is issued (Sea or Land)
-    wind_text = "あり" if is_wind_issued else "なし"
+    wind_text = "不明" if is_wind_issued is None else "あり" if is_wind_issued else "なし"
     if is_wind_issued:
         loc_parts = []
         if is_wind_land:
             loc_parts.append("陸上")
         
-        sea_keywords = ["響灘", "瀬戸内", "周防灘", "海上"]
         for loc in wind_locs:
-            if any(k in loc for k in sea_keywords):
+            if is_sea_name(loc):
                 loc_parts.append(loc)
             elif "北九州市" in loc or "北九州" in loc:
                 if "陸上" not in loc_parts: loc_parts.append("陸上")
@@ -283,33 +469,72 @@ def main():
         "result_text": result_text,
         "p3d": p3d,
         "p30d": p30d,
+        "p30d_source": p30d_source,
         "is_dry": is_dry,
         "is_strong_wind": is_wind_issued, 
         "wind_text": wind_text, 
-        "notes": f"前3日={p3d_source}確定値, 前30日=推定値(八幡), 注意報=北九州地方"
+        "notes": f"前3日={p3d_source}{'' if p3d is None else '確定値'}, 前30日={p30d_source}, 注意報=北九州地方"
     }
+    return output_data
 
-    
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-
-    js_file = os.path.join(os.path.dirname(DATA_FILE), 'data.js')
-    with open(js_file, 'w', encoding='utf-8') as f:
-        json_str = json.dumps(output_data, ensure_ascii=False, indent=2)
-        f.write(f"window.WEATHER_DATA = {json_str};")
-        
-    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-    file_exists = os.path.isfile(HISTORY_FILE)
-    with open(HISTORY_FILE, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(['date', 'time', 'level', 'p3d', 'p30d', 'is_dry', 'is_strong_wind', 'result_text', 'source'])
-        writer.writerow([
-            current_time.strftime('%Y-%m-%d'),
-            current_time.strftime('%H:%M'),
-            level, p3d, p30d, is_dry, is_wind_issued, result_text, p3d_source
-        ])
+def publish(current_time, p3d, p3d_source, p30d, p30d_source, advisories):
+    """Judges the inputs and writes docs/data.json, data.js and the history; returns the output dict."""
+    report_datetime = advisories[4]
+    output_data = build_output(current_time, p3d, p3d_source, p30d, p30d_source, advisories)
+    level = output_data['level']
+
+    # An unchanged judgment keeps the updated_at it was first published with, so
+    # data.json / data.js come out byte-identical and are left alone (no commit, no deploy)
+    previous = load_published()
+    if previous and {**previous, 'updated_at': None} == {**output_data, 'updated_at': None}:
+        output_data['updated_at'] = previous['updated_at']
+
+    json_str = json.dumps(output_data, ensure_ascii=False, indent=2)
+    with metrics.stage("write.data_json", path=DATA_FILE) as rec:
+        rec['changed'] = atomic_io.write_if_changed(DATA_FILE, json_str)
+    with metrics.stage("write.data_js", path=DATA_JS_FILE) as rec:
+        rec['changed'] = atomic_io.write_if_changed(DATA_JS_FILE, f"window.WEATHER_DATA = {json_str};")
+    meta_str = json.dumps({
+        "checked_at": current_time.strftime('%Y-%m-%d %H:%M'),
+        "report_datetime": report_datetime,
+        "judgment_changed": not previous or previous['updated_at'] != output_data['updated_at'],
+    }, ensure_ascii=False, indent=2)
+    with metrics.stage("write.meta", path=META_FILE):
+        atomic_io.write_if_changed(META_FILE, meta_str)
+        atomic_io.write_if_changed(META_JS_FILE, f"window.WEATHER_META = {meta_str};")
+
+    # Keyed by run date + JMA report time, so a rerun against the same report replaces its row
+    history = HistoryStore(HISTORY_DB)
+    try:
+        with metrics.stage("write.history"):
+            # The history keeps -1 for 判定不能, as the backfill does for unknown days
+            history.upsert(
+                current_time.strftime('%Y-%m-%d'), current_time.strftime('%H:%M'), report_datetime,
+                -1 if level is None else level, p3d, p30d, output_data['is_dry'], output_data['is_strong_wind'],
+                output_data['result_text'], p3d_source)
+            history.export_csv(HISTORY_FILE)
+        # Month shards for the dashboard trend view; normally only this month is rewritten
+        with metrics.stage("write.history_shards") as rec:
+            rec['months'] = history_shards.update(history, current_time.strftime('%Y-%m'), HISTORY_SHARD_DIR)
+    finally:
+        history.close()
+
+    metrics.write(METRICS_FILE, checked_at=current_time.strftime('%Y-%m-%d %H:%M'), level=level,
+                  p3d_source=p3d_source, p30d_source=p30d_source)
+    return output_data
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sequential', action='store_true', help='fetch JMA pages one after another')
+    parser.add_argument('--watch', action='store_true', help='keep polling and republish when the advisories change')
+    parser.add_argument('--interval', type=int, default=300, help='seconds between polls in --watch mode')
+    parser.add_argument('--replay', type=response_archive.parse_time, metavar='TIME',
+                        help='judge from the response archive as of TIME (e.g. 2026-02-02T06:00), writing nothing')
+    args = parser.parse_args()
+    if args.replay:
+        replay(args.replay, concurrent=not args.sequential)
+    elif args.watch:
+        import watch
+        watch.run(args.interval)
+    else:
+        main(concurrent=not args.sequential)
@@ -0,0 +1,82 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Run instrumentation: per-stage timings and counters, written to docs/metrics.json.
+#
+#   with metrics.stage("parse.daily_table", url=url) as s:
+#       ...
+#       s["rows"] = len(values)
+#   metrics.count("fallback.p3d")
+#
+# A stage records its duration, its fields and, if it raised, the error (the exception
+# still propagates). Recording is a perf_counter pair and a list append under a lock.
+
+METRICS_FILE = "docs/metrics.json"
+
+_lock = threading.Lock()
+_stages = []
+_counters = {}
+_started = time.perf_counter()
+
+
+def reset():
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+
+
+@contextlib.contextmanager
+def stage(name, **fields):
+    record = dict(fields)
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['stage'] = name
+        record['start_ms'] = round(1000 * (started - _started), 2)
+        record['ms'] = round(1000 * (time.perf_counter() - started), 2)
+        with _lock:
+            _stages.append(record)
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot():
+    with _lock:
+        stages = sorted(_stages, key=lambda r: r['start_ms'])
+        counters = dict(_counters)
+    totals = {}
+    for r in stages:
+        t = totals.setdefault(r['stage'], {'calls': 0, 'ms': 0.0, 'bytes': 0, 'rows': 0, 'errors': 0})
+        t['calls'] += 1
+        t['ms'] = round(t['ms'] + r['ms'], 2)
+        t['bytes'] += r.get('bytes', 0)
+        t['rows'] += r.get('rows', 0)
+        t['errors'] += 'error' in r
+    return {
+        'total_ms': round(1000 * (time.perf_counter() - _started), 2),
+        'counters': counters,
+        'totals': totals,
+        'stages': stages,
+    }
+
+
+def write(path=METRICS_FILE, **extra):
+    payload = dict(extra, **snapshot())
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    return payload
@@ -0,0 +1,95 @@
+import datetime
+import json
+import os
+import threading
+import time
+
+import pytz
+
+# Persistent cache of parsed daily_a1 / daily_s1 month pages.
+# Keyed by (prec_no, block_no, page_type, year, month). A closed month never
+# changes once its last day is confirmed, so it is kept until evicted; the
+# current month is only trusted for CURRENT_MONTH_TTL seconds.
+
+CACHE_FILE = "data/cache/precip_months.json"
+CURRENT_MONTH_TTL = 60 * 60
+MAX_ENTRIES = 240  # 20 years of one station, or a few stations for a shorter span
+
+
+def _key(prec_no, block_no, page_type, year, month):
+    return f"{prec_no}|{block_no}|{page_type}|{year}|{month:02d}"
+
+
+def _jst_today():
+    return datetime.datetime.now(pytz.timezone('Asia/Tokyo')).date()
+
+
+class PrecipCache:
+    def __init__(self, path=CACHE_FILE, ttl=CURRENT_MONTH_TTL, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def get(self, prec_no, block_no, page_type, year, month, days=None):
+        """Returns {date: precip} for the month, or None when it has to be fetched.
+
+        If days is given, the entry only counts as a hit when every one of those
+        days is present.
+        """
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(_key(prec_no, block_no, page_type, year, month))
+            if entry is None:
+                return None
+            if not entry['closed'] and time.time() - entry['fetched_at'] > self.ttl:
+                return None
+            if days and any(str(d) not in entry['days'] for d in days):
+                return None
+            entry['last_used'] = time.time()
+            return {datetime.date(year, month, int(d)): v for d, v in entry['days'].items()}
+
+    def put(self, prec_no, block_no, page_type, year, month, month_map, today=None):
+        if not month_map:
+            return
+        today = today or _jst_today()
+        days = {str(d.day): v for d, v in month_map.items()}
+        last_day = (datetime.date(year, month, 28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
+        # Only a past month whose last day is already in the table is final
+        closed = (year, month) < (today.year, today.month) and str(last_day.day) in days
+        now = time.time()
+        with self._lock:
+            entries = self._load()
+            key = _key(prec_no, block_no, page_type, year, month)
+            old = entries.get(key)
+            if old and not old['closed']:
+                # Keep days collected by earlier partial reads of the same month
+                days = {**old['days'], **days}
+            entries[key] = {'days': days, 'closed': closed, 'fetched_at': now, 'last_used': now}
+            self._evict(entries)
+            self._save(entries)
+
+    def _evict(self, entries):
+        if len(entries) <= self.max_entries:
+            return
+        # Least recently used first
+        by_age = sorted(entries, key=lambda k: entries[k]['last_used'])
+        for key in by_age[:len(entries) - self.max_entries]:
+            del entries[key]
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self, entries):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
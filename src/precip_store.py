@@ -0,0 +1,109 @@
+import csv
+import datetime
+import json
+import os
+from collections import deque
+
+# Per-station store of confirmed daily precipitation.
+# data/precip/<prec>_<block>.csv holds one row per day and is only ever appended to.
+# The .state.json sidecar keeps the last 30 days and the running 3-day / 30-day sums,
+# so a run loads, appends the newly confirmed days and saves with O(1) work per day.
+# Values are kept in tenths of a millimetre so the running sums never drift.
+
+STORE_DIR = "data/precip"
+WINDOW = 30
+
+
+def _tenths(value):
+    return int(round(value * 10))
+
+
+class DailySeriesStore:
+    def __init__(self, prec_no, block_no, directory=STORE_DIR):
+        self.prec_no = prec_no
+        self.block_no = block_no
+        base = os.path.join(directory, f"{prec_no}_{block_no}")
+        self.csv_path = base + ".csv"
+        self.state_path = base + ".state.json"
+        self.last_date = None
+        self.window = deque(maxlen=WINDOW)
+        self.sum3 = 0
+        self.sum30 = 0
+        self._pending = []
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.last_date = datetime.date.fromisoformat(state['last_date'])
+            self.window.extend(state['window'])
+            self.sum3 = state['sum3']
+            self.sum30 = state['sum30']
+            return
+        except (OSError, ValueError, KeyError):
+            pass
+        # No usable sidecar: rebuild it from the tail of the CSV
+        if not os.path.exists(self.csv_path):
+            return
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            rows = deque(csv.reader(f), maxlen=WINDOW)
+        for row in rows:
+            if row and row[0] != 'date':
+                self._push(datetime.date.fromisoformat(row[0]), _tenths(float(row[1])))
+
+    def _push(self, date, tenths):
+        if self.last_date is not None and date != self.last_date + datetime.timedelta(days=1):
+            # A gap breaks both windows; start them again from this day
+            self.window.clear()
+            self.sum3 = self.sum30 = 0
+        if len(self.window) == WINDOW:
+            self.sum30 -= self.window[0]
+        if len(self.window) >= 3:
+            self.sum3 -= self.window[-3]
+        self.window.append(tenths)
+        self.sum3 += tenths
+        self.sum30 += tenths
+        self.last_date = date
+
+    def append(self, date, value):
+        """Adds the confirmed value for the day after last_date."""
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"{date} is not after the last stored day {self.last_date}")
+        self._push(date, _tenths(value))
+        self._pending.append((date, value))
+
+    def totals(self, through):
+        """(p3d, p30d) in mm for the 3 / 30 days ending at through, or None if not covered."""
+        if self.last_date != through or len(self.window) < WINDOW:
+            return None
+        return self.sum3 / 10, self.sum30 / 10
+
+    def missing_days(self, through):
+        """Days to fetch so the store reaches through, bootstrapping a full window if needed."""
+        start = through - datetime.timedelta(days=WINDOW - 1)
+        if self.last_date is not None and self.last_date >= start:
+            start = self.last_date + datetime.timedelta(days=1)
+        return [start + datetime.timedelta(days=i) for i in range((through - start).days + 1)]
+
+    def save(self):
+        if not self._pending:
+            return
+        os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
+        new_file = not os.path.exists(self.csv_path)
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(['date', 'precip'])
+            for date, value in self._pending:
+                writer.writerow([date.isoformat(), value])
+        self._pending = []
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_date': self.last_date.isoformat(),
+                'window': list(self.window),
+                'sum3': self.sum3,
+                'sum30': self.sum30,
+            }, f)
+        os.replace(tmp, self.state_path)
@@ -0,0 +1,237 @@
+import argparse
+import ast
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import urllib.parse
+
+import pytz
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import metrics
+
+# Content-addressed archive of every JMA response the system has read.
+#
+#   data/archive/blobs/ab/ab12...ef.gz   gzip of the body, named by the sha256 of the raw bytes
+#   data/archive/index.jsonl             one line per fetch: endpoint, fetch time, reportDatetime, blob
+#
+# Identical bodies (an unchanged warning JSON, a closed month page) share one blob, and a
+# fetch returning the same body as the previous fetch of its endpoint adds no index line,
+# so the archive only grows with distinct content. In replay mode (main.py --replay TIME)
+# fetch_policy answers every request with the newest body archived at or before TIME
+# instead of going to JMA.
+#
+#   python src/response_archive.py stats
+#   python src/response_archive.py list --endpoint warning
+#   python src/response_archive.py import warning_debug.json --url https://www.jma.go.jp/bosai/warning/data/warning/400000.json
+
+ARCHIVE_DIR = "data/archive"
+JST = pytz.timezone('Asia/Tokyo')
+# reportDatetime sits near the top of the bosai JSON documents
+_REPORT_RE = re.compile(rb'"reportDatetime"\s*:\s*"([^"]+)"')
+
+
+def endpoint_of(url):
+    """Path and query of url; the host is left out so a mirror's responses file under the same endpoint."""
+    parts = urllib.parse.urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def parse_time(value):
+    t = datetime.datetime.fromisoformat(value)
+    return JST.localize(t) if t.tzinfo is None else t
+
+
+class Archive:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def blob_path(self, sha):
+        return os.path.join(self.directory, "blobs", sha[:2], sha + ".gz")
+
+    def record(self, url, body, content_type=None, fetched_at=None, partial=False):
+        """Stores body (bytes) fetched from url; returns its sha256."""
+        sha = hashlib.sha256(body).hexdigest()
+        fetched_at = fetched_at or datetime.datetime.now(JST)
+        m = _REPORT_RE.search(body, 0, 4096)
+        entry = {
+            'endpoint': endpoint_of(url),
+            'fetched_at': fetched_at.isoformat(timespec='seconds'),
+            'report_datetime': m.group(1).decode('utf-8') if m else None,
+            'sha256': sha,
+            'bytes': len(body),
+            'content_type': content_type,
+        }
+        if partial:
+            # A streamed page abandoned once the wanted days were in
+            entry['partial'] = True
+        path = self.blob_path(sha)
+        endpoint = entry['endpoint']
+        latest = None
+        for e in self.entries():
+            if e['endpoint'] == endpoint:
+                latest = e
+        if latest is not None and latest['sha256'] == sha and latest.get('partial') == entry.get('partial'):
+            # Same body as the last fetch: replay finds it under the earlier entry, and an
+            # unchanged poll leaves data/archive untouched
+            metrics.count("archive.unchanged")
+            return sha
+        with self._lock:
+            new = not os.path.exists(path)
+            if new:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                # mtime=0 keeps the gzip bytes a function of the body alone
+                with open(tmp, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                    f.write(body)
+                os.replace(tmp, path)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if self._entries is not None:
+                self._entries.append(entry)
+        metrics.count("archive.new_blob" if new else "archive.dedup")
+        return sha
+
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = []
+                try:
+                    with open(self.index_path, encoding='utf-8') as f:
+                        self._entries = [json.loads(line) for line in f if line.strip()]
+                except OSError:
+                    pass
+            return list(self._entries)
+
+    def read(self, sha):
+        with gzip.open(self.blob_path(sha), 'rb') as f:
+            return f.read()
+
+    def lookup(self, url, at):
+        """The newest index entry for url fetched at or before at, or None."""
+        endpoint = endpoint_of(url)
+        best, best_time = None, None
+        for e in self.entries():
+            if e['endpoint'] != endpoint:
+                continue
+            t = parse_time(e['fetched_at'])
+            if t <= at and (best_time is None or t >= best_time):
+                best, best_time = e, t
+        return best
+
+    def response(self, url, at):
+        """A requests.Response carrying the body url had at time at, or None."""
+        entry = self.lookup(url, at)
+        if entry is None:
+            return None
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = url
+        resp.headers = CaseInsensitiveDict()
+        if entry.get('content_type'):
+            resp.headers['Content-Type'] = entry['content_type']
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp._content = self.read(entry['sha256'])
+        resp._content_consumed = True
+        resp.from_cache = False
+        resp.archived_at = entry['fetched_at']
+        return resp
+
+
+ARCHIVE = Archive()
+
+# Set by start_replay(); while set, responses come from the archive and nothing is recorded
+replay_at = None
+
+
+def start_replay(at):
+    global replay_at
+    replay_at = at
+
+
+def record(url, body, content_type=None, partial=False):
+    """Archives a live response; never lets an archive problem fail the fetch."""
+    if replay_at is not None:
+        return
+    try:
+        ARCHIVE.record(url, body, content_type, partial=partial)
+    except OSError as e:
+        print(f"Could not archive {url}: {e}")
+
+
+def import_file(archive, path, url, fetched_at=None):
+    """Archives a legacy dump: UTF-8 JSON, or a UTF-16 Python repr as written by the old debug scripts."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw.startswith((b'\xff\xfe', b'\xfe\xff')):
+        data = ast.literal_eval(raw.decode('utf-16').strip())
+    else:
+        data = json.loads(raw.decode('utf-8-sig'))
+    # The dumps were re-indented, so the original bytes are gone; store the document compactly
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if fetched_at is None:
+        # The report time is the closest thing to a fetch time the dump still carries
+        fetched_at = parse_time(data['reportDatetime']) if isinstance(data, dict) and data.get('reportDatetime') \
+            else datetime.datetime.fromtimestamp(os.path.getmtime(path), JST)
+    sha = hashlib.sha256(body).hexdigest()
+    stamp = fetched_at.isoformat(timespec='seconds')
+    if any(e['sha256'] == sha and e['fetched_at'] == stamp and e['endpoint'] == endpoint_of(url)
+           for e in archive.entries()):
+        return sha
+    return archive.record(url, body, 'application/json', fetched_at)
+
+
+def stats(archive):
+    entries = archive.entries()
+    blobs = {e['sha256']: e['bytes'] for e in entries}
+    stored = sum(os.path.getsize(archive.blob_path(sha)) for sha in blobs if os.path.exists(archive.blob_path(sha)))
+    return {
+        'fetches': len(entries),
+        'endpoints': len({e['endpoint'] for e in entries}),
+        'distinct_bodies': len(blobs),
+        'fetched_bytes': sum(e['bytes'] for e in entries),
+        'distinct_bytes': sum(blobs.values()),
+        'stored_bytes': stored,
+    }
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Inspect or add to the JMA response archive")
+    parser.add_argument('--dir', default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats')
+    p = sub.add_parser('list')
+    p.add_argument('--endpoint', default='', help='substring of the endpoint')
+    p = sub.add_parser('import', help='archive a legacy dump of a JSON response')
+    p.add_argument('path')
+    p.add_argument('--url', required=True, help='URL the dump was fetched from')
+    p.add_argument('--fetched-at', type=parse_time, help='default: its reportDatetime')
+    args = parser.parse_args()
+
+    archive = Archive(args.dir)
+    if args.command == 'stats':
+        for k, v in stats(archive).items():
+            print(f"{k}: {v}")
+    elif args.command == 'list':
+        for e in archive.entries():
+            if args.endpoint in e['endpoint']:
+                print(f"{e['fetched_at']}  {e['sha256'][:12]}  {e['bytes']:>8}  {e['report_datetime'] or '-':<25}  {e['endpoint']}")
+    else:
+        sha = import_file(archive, args.path, args.url, args.fetched_at)
+        print(f"{args.path} -> {sha}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,153 @@
+import argparse
 import asyncio
-from playwright.async_api import async_playwright
+import hashlib
 import os
 import json
+import shutil
+import time
 
-async def run():
+DATA_PATH = "docs/data.json"
+META_PATH = "docs/meta.json"
+OUTPUT_PATH = "screenshot.png"
+
+# The mail image is drawn natively from docs/data.json (card_renderer).
+# --full-page captures docs/index.html in Chromium instead; only that path needs Playwright.
+# Either way the image is reused from data/cache when the displayed values and the page
+# sources have not changed since the last render.
+
+CACHE_META = "data/cache/screenshot.json"
+CACHE_IMAGE = "data/cache/screenshot.png"
+# What the card shows. updated_at only moves when the judgment does (main.publish), so an
+# unchanged judgment still reuses the image
+DISPLAYED_FIELDS = ('level', 'result_text', 'updated_at', 'p3d', 'p30d', 'p30d_source', 'is_dry', 'is_strong_wind', 'wind_text')
+PAGE_SOURCES = ("docs/index.html", "docs/style.css", "src/card_renderer.py")
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def _checked_at():
+    try:
+        with open(META_PATH, encoding='utf-8') as f:
+            return json.load(f).get('checked_at')
+    except (OSError, ValueError):
+        return None
+
+def render_key(data, mode):
+    from card_renderer import find_fonts
+    payload = {
+        'mode': mode,
+        'data': {k: data.get(k) for k in DISPLAYED_FIELDS},
+        'sources': {p: _file_hash(p) for p in PAGE_SOURCES},
+        # An image drawn with the ASCII fallback (no CJK font yet) must not outlive the font's arrival
+        'fonts': find_fonts(),
+    }
+    if mode.startswith('page'):
+        # The page also shows 最終確認 from meta.js
+        payload['checked_at'] = _checked_at()
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def restore_cached(key):
+    try:
+        with open(CACHE_META, encoding='utf-8') as f:
+            if json.load(f).get('key') != key:
+                return False
+        shutil.copyfile(CACHE_IMAGE, OUTPUT_PATH)
+        return True
+    except (OSError, ValueError):
+        return False
+
+def store_cached(key):
+    if not os.path.exists(OUTPUT_PATH):
+        return
+    os.makedirs(os.path.dirname(CACHE_META), exist_ok=True)
+    shutil.copyfile(OUTPUT_PATH, CACHE_IMAGE)
+    with open(CACHE_META, 'w', encoding='utf-8') as f:
+        json.dump({'key': key}, f)
+
+def render_native(data, scale=1):
+    from card_renderer import render_card
+    started = time.perf_counter()
+    render_card(data, OUTPUT_PATH, scale=scale)
+    print(f"Card rendered to {OUTPUT_PATH} in {1000 * (time.perf_counter() - started):.0f}ms")
+
+# Full-page variants captured in one browser session: name -> (viewport, device scale)
+VARIANTS = {
+    'mail': ({'width': 600, 'height': 800}, 1),
+    'mobile': ({'width': 390, 'height': 844}, 1),
+    'desktop': ({'width': 1280, 'height': 900}, 1),
+    'hidpi': ({'width': 600, 'height': 800}, 2),
+}
+
+VIEWPORT_KEY = "{0[width]}x{0[height]}@{1}".format(*VARIANTS['mail'])
+
+def variant_path(name):
+    # The mail variant keeps the attachment name the workflow expects
+    return OUTPUT_PATH if name == 'mail' else f"screenshot_{name}.png"
+
+async def capture(browser, url, name):
+    viewport, scale = VARIANTS[name]
+    started = time.perf_counter()
+    page = await browser.new_page(viewport=viewport, device_scale_factor=scale)
+    try:
+        await page.goto(url, timeout=60000)
+        # updateUI() drops the loading class once data.js has been applied
+        await page.wait_for_selector("#result-card:not(.loading)", timeout=15000)
+        await page.screenshot(path=variant_path(name))
+    finally:
+        await page.close()
+    print(f"  {name}: {variant_path(name)} in {1000 * (time.perf_counter() - started):.0f}ms")
+
+async def run(variants=('mail',)):
+    from playwright.async_api import async_playwright
     print("Starting screenshot generation...")
+    url = "file://" + os.path.abspath("docs/index.html")
+    print(f"Loading page: {url}")
+    started = time.perf_counter()
     async with async_playwright() as p:
+        browser = await p.chromium.launch()
         try:
-            # Launch browser
-            browser = await p.chromium.launch()
-            page = await browser.new_page(viewport={'width': 600, 'height': 800})
-            
-            # Load local index.html
-            abs_path = os.path.abspath("docs/index.html")
-            print(f"Loading page: file://{abs_path}")
-            await page.goto(f"file://{abs_path}", timeout=60000)
-            
-            # Wait for data.js to be loaded and UI to update
-            await asyncio.sleep(5)
-            
-            # Take screenshot
-            await page.screenshot(path="screenshot.png")
-            print("Screenshot saved to screenshot.png")
-            
+            results = await asyncio.gather(*(capture(browser, url, name) for name in variants),
+                                           return_exceptions=True)
+            for name, result in zip(variants, results):
+                if isinstance(result, Exception):
+                    print(f"Error capturing {name}: {result}")
+        finally:
             await browser.close()
-        except Exception as e:
-            print(f"Error during screenshot generation: {e}")
+    print(f"Captured {len(variants)} variant(s) in {time.perf_counter() - started:.2f}s")
 
 def export_env():
     print("Exporting data to GITHUB_ENV...")
     try:
-        data_path = "docs/data.json"
+        data_path = DATA_PATH
         if not os.path.exists(data_path):
             print(f"Error: {data_path} not found")
             return
-            
+
         with open(data_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-            
+        # updated_at only moves when the judgment changes; the mail reports this run's check time
+        try:
+            with open(META_PATH, "r", encoding="utf-8") as f:
+                data['updated_at'] = json.load(f)['checked_at']
+        except (OSError, ValueError, KeyError):
+            pass
+
         env_file = os.environ.get("GITHUB_ENV")
         if env_file:
             with open(env_file, "a", encoding="utf-8") as f:
+                # None marks an input that could not be fetched (判定不能)
                 f.write(f"REPORT_DATE={data['updated_at'].split(' ')[0]}\n")
                 f.write(f"UPDATED_AT={data['updated_at']}\n")
                 f.write(f"RESULT_TEXT={data['result_text']}\n")
-                f.write(f"JUDGMENT_LEVEL={data['level']}\n")
-                f.write(f"P3D={data['p3d']}\n")
-                f.write(f"P30D={data['p30d']}\n")
+                f.write(f"JUDGMENT_LEVEL={'' if data['level'] is None else data['level']}\n")
+                f.write(f"P3D={'取得失敗' if data['p3d'] is None else data['p3d']}\n")
+                f.write(f"P30D={'取得失敗' if data['p30d'] is None else data['p30d']}\n")
                 f.write(f"WIND_TEXT={data['wind_text']}\n")
-                f.write(f"ADVISORY_DRY={'あり' if data['is_dry'] else 'なし'}\n")
+                f.write(f"ADVISORY_DRY={'不明' if data['is_dry'] is None else 'あり' if data['is_dry'] else 'なし'}\n")
             print("Environment variables exported successfully.")
         else:
             print("GITHUB_ENV not set, printing values instead:")
@@ -58,5 +157,42 @@ def export_env():
         print(f"Error exporting env: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--full-page', action='store_true', help='capture docs/index.html with Playwright/Chromium')
+    parser.add_argument('--variants', default='mail',
+                        help=f"comma-separated full-page variants ({','.join(VARIANTS)}) or 'all'")
+    parser.add_argument('--scale', type=float, default=1, help='pixel scale of the native card')
+    parser.add_argument('--force', action='store_true', help='render even if the cached image is current')
+    args = parser.parse_args()
+    variants = list(VARIANTS) if args.variants == 'all' else args.variants.split(',')
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(unknown)}")
+
+    key = None
+    try:
+        with open(DATA_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # Only the mail image is cached; extra full-page variants always re-render
+        if variants == ['mail'] or not args.full_page:
+            key = render_key(data, f"page-{VIEWPORT_KEY}" if args.full_page else f"card-{args.scale}")
+    except (OSError, ValueError) as e:
+        print(f"Error reading {DATA_PATH}: {e}")
+        data = None
+
+    if key and not args.force and restore_cached(key):
+        print(f"Displayed data unchanged; reused cached image for {OUTPUT_PATH}")
+    elif data is not None:
+        try:
+            # A failed capture must not leave the previous image to be cached under the new key
+            if os.path.exists(OUTPUT_PATH):
+                os.remove(OUTPUT_PATH)
+            if args.full_page:
+                asyncio.run(run(variants))
+            else:
+                render_native(data, args.scale)
+            if key:
+                store_cached(key)
+        except Exception as e:
+            print(f"Error during screenshot generation: {e}")
     export_env()
@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+import area_index
+
+# One-pass index over the prefectural warning JSON (bosai/warning/data/warning/XXXXXX.json).
+# get_advisories() and the diagnostics look up areas and warning codes here
+# instead of re-walking areaTypes / timeSeries for every question.
+
+ACTIVE_STATUSES = ('発表', '継続')
+DRY_CODE = '21'
+# 強風注意報 (15, 06, or 04 depending on context)
+WIND_CODES = ('06', '15', '04')
+# timeSeries level values: "00" none, "10" advisory, "20" and up warning grades
+ADVISORY_LEVEL = 10
+
+# One localArea row of a timeSeries level: values are aligned to time_defines
+LocalAreaLevels = namedtuple('LocalAreaLevels', 'name code is_sea level_type values time_defines')
+
+
+def is_sea_name(name):
+    # Land/sea comes from the localAreas of data/area_index.json
+    return area_index.is_sea(name)
+
+
+def level_of(value):
+    """Numeric level of one timeSeries value ("00", "10", ...); anything but one or two digits counts as 0."""
+    return int(value) if value and len(value) <= 2 and value.isascii() and value.isdigit() else 0
+
+
+def is_active_values(values):
+    return any(level_of(v) >= ADVISORY_LEVEL for v in values)
+
+
+class WarningIndex:
+    def __init__(self, data):
+        self.report_datetime = data.get('reportDatetime')
+        self.headline = data.get('headlineText', '')
+        # area code -> {warning code: status}
+        self.status = {}
+        # (area code, warning code) -> [LocalAreaLevels, ...], filled by local_areas()
+        self.levels = {}
+
+        for at in data.get('areaTypes', []):
+            for a in at.get('areas', []):
+                codes = self.status.setdefault(a.get('code'), {})
+                for w in a.get('warnings', []):
+                    if w.get('code'):
+                        codes[w['code']] = w.get('status')
+
+        # Rows are only materialized for the (area, code) pairs that are asked about
+        self._raw_levels = {}
+        for ts in data.get('timeSeries', []):
+            time_defines = ts.get('timeDefines', [])
+            for at in ts.get('areaTypes', []):
+                for a in at.get('areas', []):
+                    area_code = a.get('code')
+                    for w in a.get('warnings', []):
+                        self._raw_levels.setdefault((area_code, w.get('code')), []).append((w.get('levels', []), time_defines))
+
+    def local_areas(self, area_code, code):
+        """All LocalAreaLevels rows for one area and warning code."""
+        key = (area_code, code)
+        rows = self.levels.get(key)
+        if rows is None:
+            rows = []
+            for levels, time_defines in self._raw_levels.get(key, ()):
+                for level in levels:
+                    for la in level.get('localAreas', []):
+                        loc_code = la.get('localAreaCode')
+                        loc_name = la.get('localAreaName', '')
+                        rows.append(LocalAreaLevels(
+                            loc_name, loc_code, area_index.is_sea(loc_name, loc_code),
+                            level.get('type'), la.get('values', []), time_defines))
+            self.levels[key] = rows
+        return rows
+
+    def has_active(self, area_code, codes):
+        """True if any of codes has status 発表/継続 for the area."""
+        statuses = self.status.get(area_code, {})
+        return any(statuses.get(c) in ACTIVE_STATUSES for c in codes)
+
+    def active_local_areas(self, area_code, codes):
+        """LocalAreaLevels rows of the area that reach advisory level for any of codes."""
+        found = []
+        for code in codes:
+            for row in self.local_areas(area_code, code):
+                if is_active_values(row.values):
+                    found.append(row)
+        return found
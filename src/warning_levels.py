@@ -0,0 +1,133 @@
+import datetime
+
+import numpy as np
+
+from warning_index import ADVISORY_LEVEL
+
+# Level matrices over the timeSeries of a warning JSON, for every area of the file.
+#
+#   m = LevelMatrix(Snapshot(data))
+#   m.windows(area='4010000', code='15')
+#   -> [{'area': '4010000', 'code': '15', 'local': None, 'from': '...T15:00', 'to': '...T06:00', 'peak': 10, ...}]
+#
+# Each timeSeries entry has its own time axis (3-hourly for the first days, daily after),
+# so each gets one int16 matrix: a row per (area, code, level type, localArea), a column
+# per timeDefine. Intervals in force (level >= ADVISORY_LEVEL) and their peaks come from
+# array operations over the whole matrix; rows of one (area, code) are folded with a
+# row-wise maximum, which gives the windows of "anywhere in the area".
+
+
+class SeriesLevels:
+    __slots__ = ('series', 'time_defines', 'end', 'rows', 'levels', 'keys', 'group_starts')
+
+    def __init__(self, series, time_defines, rows):
+        self.series = series
+        self.time_defines = time_defines
+        # A window running to the last column ends one step after the last timeDefine
+        self.end = _series_end(time_defines)
+        self.rows = rows
+        n = len(time_defines)
+        # Ragged or missing values are padded with "" (level 0)
+        text = np.array([(list(r.values) + [''] * n)[:n] for r in rows], dtype='U4').reshape(len(rows), n)
+        self.levels = parse_levels(text)
+        # rows arrive grouped by (area, code); group_starts indexes the first row of each group
+        self.keys = []
+        starts = []
+        for i, r in enumerate(rows):
+            key = (r.area, r.code)
+            if not self.keys or self.keys[-1] != key:
+                self.keys.append(key)
+                starts.append(i)
+        self.group_starts = np.array(starts, dtype=np.intp)
+
+    def group_levels(self):
+        """Row-wise maximum over the rows of each (area, code), in self.keys order."""
+        if not len(self.rows):
+            return self.levels
+        return np.maximum.reduceat(self.levels, self.group_starts, axis=0)
+
+    def time_at(self, column):
+        return self.time_defines[column] if column < len(self.time_defines) else self.end
+
+
+def parse_levels(text):
+    """int16 levels of a 'U4' array of timeSeries values, as warning_index.level_of reads one.
+
+    Works on the code points instead of str -> int conversion (about 9x faster): level
+    values are one or two digits, anything else (blank, text, longer numbers) is 0.
+    """
+    points = text.view(np.uint32).reshape(*text.shape, 4).astype(np.int32)
+    digits = points - ord('0')
+    is_digit = (digits >= 0) & (digits <= 9)
+    two = is_digit[..., 0] & is_digit[..., 1] & (points[..., 2] == 0)
+    one = is_digit[..., 0] & (points[..., 1] == 0)
+    return np.where(two, digits[..., 0] * 10 + digits[..., 1], np.where(one, digits[..., 0], 0)).astype(np.int16)
+
+
+def _series_end(time_defines):
+    if not time_defines:
+        return None
+    if len(time_defines) < 2:
+        return time_defines[-1]
+    last = datetime.datetime.fromisoformat(time_defines[-1])
+    step = last - datetime.datetime.fromisoformat(time_defines[-2])
+    return (last + step).isoformat()
+
+
+def intervals(levels, threshold=ADVISORY_LEVEL):
+    """(row, start, end, peak) arrays of the runs where levels >= threshold; end is exclusive."""
+    rows, n = levels.shape
+    active = np.zeros((rows, n + 2), dtype=np.int8)
+    active[:, 1:-1] = levels >= threshold
+    edges = np.diff(active, axis=1)
+    # nonzero walks row-major, so the k-th rise and the k-th fall belong to the same run
+    row, start = np.nonzero(edges == 1)
+    _, end = np.nonzero(edges == -1)
+    if not len(row):
+        return row, start, end, np.zeros(0, dtype=levels.dtype)
+    flat = np.append(levels.ravel(), 0)
+    bounds = np.empty(2 * len(row), dtype=np.intp)
+    bounds[0::2] = row * n + start
+    bounds[1::2] = row * n + end
+    peak = np.maximum.reduceat(flat, bounds)[0::2]
+    return row, start, end, peak
+
+
+class LevelMatrix:
+    def __init__(self, snapshot):
+        by_series = [[] for _ in snapshot.time_defines]
+        for rows in snapshot.levels.values():
+            for r in rows:
+                by_series[r.series].append(r)
+        self.series = [SeriesLevels(i, td, rows) for i, (td, rows) in enumerate(zip(snapshot.time_defines, by_series))]
+
+    def windows(self, area=None, code=None, local=False, threshold=ADVISORY_LEVEL):
+        """Intervals in force per (area, code), or per localArea row with local=True."""
+        out = []
+        for s in self.series:
+            if not len(s.rows):
+                continue
+            if local:
+                row, start, end, peak = intervals(s.levels, threshold)
+                describe = [(r.area, r.code, r.name, r.level_type) for r in s.rows]
+            else:
+                row, start, end, peak = intervals(s.group_levels(), threshold)
+                describe = [(a, c, None, None) for a, c in s.keys]
+            for i, a, b, p in zip(row.tolist(), start.tolist(), end.tolist(), peak.tolist()):
+                r_area, r_code, r_local, r_type = describe[i]
+                if (area is None or r_area == area) and (code is None or r_code == code):
+                    out.append({
+                        'area': r_area, 'code': r_code, 'local': r_local, 'level_type': r_type,
+                        'series': s.series, 'from': s.time_at(a), 'to': s.time_at(b), 'peak': p,
+                    })
+        return out
+
+    def peaks(self):
+        """{(area, code): highest level anywhere on any time axis}"""
+        out = {}
+        for s in self.series:
+            if not len(s.rows):
+                continue
+            for key, peak in zip(s.keys, s.group_levels().max(axis=1).tolist()):
+                out[key] = max(out.get(key, 0), peak)
+        return out
@@ -0,0 +1,136 @@
+import json
+import sys
+
+import area_index
+from warning_index import is_active_values
+
+# Compact typed model of a prefectural warning JSON (bosai/warning/data/warning/XXXXXX.json)
+# for the diagnostics CLI. The document is walked once; area and warning codes are
+# interned, so the thousands of repeated '4010000' / '15' strings share one object and
+# lookups compare by identity first. Records use __slots__ instead of per-instance dicts.
+#
+#   snap = Snapshot.from_text(text)
+#   snap.status['4010000']            -> [Warning('15', '発表'), ...]
+#   snap.local_areas('4010000', '15') -> [LocalLevels, ...]
+
+_intern = sys.intern
+
+
+def _code(value):
+    return _intern(value) if value else value
+
+
+class Warning:
+    __slots__ = ('area', 'code', 'status')
+
+    def __init__(self, area, code, status):
+        self.area = area
+        self.code = code
+        self.status = status
+
+    @property
+    def active(self):
+        return self.status in ('発表', '継続')
+
+    def as_dict(self):
+        return {'area_code': self.area, 'warning_code': self.code, 'status': self.status}
+
+    def __repr__(self):
+        return f"Warning({self.area!r}, {self.code!r}, {self.status!r})"
+
+
+class LocalLevels:
+    """One localArea row of a timeSeries level; values are aligned to snap.time_defines[series]."""
+    __slots__ = ('area', 'code', 'series', 'level_type', 'name', 'local_code', 'values', 'additions')
+
+    def __init__(self, area, code, series, level_type, name, local_code, values, additions):
+        self.area = area
+        self.code = code
+        self.series = series
+        self.level_type = level_type
+        self.name = name
+        self.local_code = local_code
+        self.values = values
+        self.additions = additions
+
+    @property
+    def is_sea(self):
+        return area_index.is_sea(self.name, self.local_code)
+
+    @property
+    def active(self):
+        return is_active_values(self.values)
+
+    def __repr__(self):
+        return f"LocalLevels({self.area!r}, {self.code!r}, {self.name!r}, {self.values!r})"
+
+
+class Snapshot:
+    __slots__ = ('report_datetime', 'office', 'headline', 'area_types', 'time_defines',
+                 'status', 'levels', 'series_areas')
+
+    def __init__(self, data):
+        self.report_datetime = data.get('reportDatetime')
+        self.office = data.get('publishingOffice')
+        self.headline = data.get('headlineText', '')
+        # area codes per areaTypes entry, in document order
+        self.area_types = []
+        # area code -> [Warning, ...]
+        self.status = {}
+        for at in data.get('areaTypes', []):
+            codes = []
+            for a in at.get('areas', []):
+                area = _code(a.get('code'))
+                codes.append(area)
+                self.status[area] = [Warning(area, _code(w.get('code')), w.get('status'))
+                                     for w in a.get('warnings', []) if w.get('code')]
+            self.area_types.append(codes)
+
+        # time_defines[series] is the time axis of every LocalLevels row with that series
+        self.time_defines = []
+        # (area code, warning code) -> [LocalLevels, ...]
+        self.levels = {}
+        # area codes per timeSeries entry
+        self.series_areas = []
+        for series, ts in enumerate(data.get('timeSeries', [])):
+            self.time_defines.append(ts.get('timeDefines', []))
+            codes = []
+            for at in ts.get('areaTypes', []):
+                for a in at.get('areas', []):
+                    area = _code(a.get('code'))
+                    codes.append(area)
+                    for w in a.get('warnings', []):
+                        code = _code(w.get('code'))
+                        rows = self.levels.setdefault((area, code), [])
+                        for level in w.get('levels', []):
+                            level_type = level.get('type')
+                            for la in level.get('localAreas', []):
+                                rows.append(LocalLevels(
+                                    area, code, series, level_type, la.get('localAreaName'),
+                                    _code(la.get('localAreaCode')), la.get('values', []),
+                                    la.get('additions', [])))
+            self.series_areas.append(codes)
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(json.loads(text))
+
+    def warnings(self, area=None, code=None, active_only=False):
+        """Warning records in document order, optionally narrowed to one area and/or code."""
+        areas = [area] if area is not None else self.status
+        for a in areas:
+            for w in self.status.get(a, ()):
+                if (code is None or w.code == code) and (not active_only or w.active):
+                    yield w
+
+    def local_areas(self, area, code):
+        return self.levels.get((area, code), [])
+
+    def codes(self):
+        """{warning code: {status: number of areas}}"""
+        counts = {}
+        for ws in self.status.values():
+            for w in ws:
+                by_status = counts.setdefault(w.code, {})
+                by_status[w.status] = by_status.get(w.status, 0) + 1
+        return counts
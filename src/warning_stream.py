@@ -0,0 +1,138 @@
+import json
+import re
+
+# Event-style parse of the prefectural warning JSON that keeps only the wanted areas.
+# Everything outside reportDatetime / publishingOffice / headlineText and the target
+# areas' entries in areaTypes and timeSeries is stepped over bracket by bracket,
+# without building Python objects for it. The result has the same shape as the
+# full document, so WarningIndex and evaluate_advisories() take it unchanged.
+
+_DECODER = json.JSONDecoder()
+_WS = re.compile(r'[ \t\n\r]*')
+# A run of anything except brackets, with strings consumed whole (they may contain brackets)
+_NO_BRACKETS = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_AREA_CODE = re.compile(r'\{\s*"code"\s*:\s*"([^"\\]*)"')
+# Area codes are 6-7 digits; warning codes inside an area are 2 digits
+_NEXT_AREA = re.compile(r'\{\s*"code"\s*:\s*"\d{6,}"')
+_SKIPPED = object()
+
+
+def parse_warning_subset(text, area_codes):
+    """Parses a warning document, keeping only the areas whose code is in area_codes."""
+    wanted = frozenset(area_codes)
+
+    def areas(s, pos):
+        def area(s, pos):
+            m = _AREA_CODE.match(s, pos)
+            if m and m.group(1) not in wanted:
+                return _SKIPPED, _skip_area(s, pos)
+            value, end = _DECODER.raw_decode(s, pos)
+            # Fallback for an area whose first key is not "code"
+            if value.get('code') not in wanted:
+                return _SKIPPED, end
+            return value, end
+
+        return _array(s, pos, area)
+
+    area_types = lambda s, pos: _array(s, pos, lambda s, pos: _object(s, pos, {'areas': areas}))
+    time_series = lambda s, pos: _array(s, pos, lambda s, pos: _object(s, pos, {
+        'timeDefines': _DECODER.raw_decode,
+        'areaTypes': area_types,
+    }))
+
+    value, _ = _object(text, _ws(text, 0), {
+        'reportDatetime': _DECODER.raw_decode,
+        'publishingOffice': _DECODER.raw_decode,
+        'headlineText': _DECODER.raw_decode,
+        'areaTypes': area_types,
+        'timeSeries': time_series,
+    })
+    return value
+
+
+def _ws(s, pos):
+    return _WS.match(s, pos).end()
+
+
+def _expect(s, pos, chars):
+    if pos >= len(s) or s[pos] not in chars:
+        raise ValueError(f"Expected one of {chars!r} at position {pos}")
+
+
+def _skip_value(s, pos):
+    """Returns the end of the value starting at s[pos] without building it."""
+    if s[pos] not in '{[':
+        return _DECODER.raw_decode(s, pos)[1]
+    return _skip_brackets(s, pos)
+
+
+def _skip_area(s, pos):
+    """Ends the area object at s[pos] where its next sibling area begins.
+
+    The first area start after pos that follows a ',' is the next element of the
+    same areas array (the first area of any other array follows a '['). The last
+    area of an array has no such sibling and is skipped bracket by bracket.
+    """
+    m = _NEXT_AREA.search(s, pos + 1)
+    if m:
+        end = m.start() - 1
+        while s[end] in ' \t\n\r':
+            end -= 1
+        if s[end] == ',':
+            return end
+    return _skip_brackets(s, pos)
+
+
+def _skip_brackets(s, pos):
+    depth = 0
+    n = len(s)
+    while pos < n:
+        c = s[pos]
+        if c == '{' or c == '[':
+            depth += 1
+        elif c == '}' or c == ']':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos = _NO_BRACKETS.match(s, pos + 1).end()
+    raise ValueError("Unterminated JSON value")
+
+
+def _array(s, pos, item):
+    _expect(s, pos, '[')
+    out = []
+    pos = _ws(s, pos + 1)
+    if s[pos] == ']':
+        return out, pos + 1
+    while True:
+        value, pos = item(s, pos)
+        if value is not _SKIPPED:
+            out.append(value)
+        pos = _ws(s, pos)
+        _expect(s, pos, ',]')
+        if s[pos] == ']':
+            return out, pos + 1
+        pos = _ws(s, pos + 1)
+
+
+def _object(s, pos, fields):
+    _expect(s, pos, '{')
+    out = {}
+    pos = _ws(s, pos + 1)
+    if s[pos] == '}':
+        return out, pos + 1
+    while True:
+        key, pos = _DECODER.raw_decode(s, pos)
+        pos = _ws(s, pos)
+        _expect(s, pos, ':')
+        pos = _ws(s, pos + 1)
+        parser = fields.get(key)
+        if parser is None:
+            pos = _skip_value(s, pos)
+        else:
+            out[key], pos = parser(s, pos)
+        pos = _ws(s, pos)
+        _expect(s, pos, ',}')
+        if s[pos] == '}':
+            return out, pos + 1
+        pos = _ws(s, pos + 1)
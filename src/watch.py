@@ -0,0 +1,134 @@
+import datetime
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytz
+
+import fetch_policy
+import main as jma
+import metrics
+
+# Watch mode: keeps polling the warning JSON and republishes as soon as the advisories
+# for Kitakyushu change, instead of waiting for the next morning's cron run.
+#
+#   python src/main.py --watch --interval 300
+#
+# An unchanged file is answered with a 304 by jma_client's revalidation, so a quiet poll
+# costs one conditional request and no parsing. A changed file is parsed for the target
+# area only; judgment and outputs are redone only when the evaluated advisories (or the
+# day, which moves the precipitation windows) differ from the last published state.
+# Level transitions are printed and appended to data/events.jsonl as JSON lines.
+
+DEFAULT_INTERVAL = 300
+EVENTS_FILE = "data/events.jsonl"
+JST = pytz.timezone('Asia/Tokyo')
+
+
+def advisory_fingerprint(advisories):
+    # reportDatetime moves on every reissue even when nothing changes for this area
+    is_dry, is_wind_issued, is_wind_land, wind_locs, _ = advisories
+    raw = json.dumps([is_dry, is_wind_issued, is_wind_land, wind_locs], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def emit_event(event, path=EVENTS_FILE):
+    line = json.dumps(event, ensure_ascii=False)
+    print(line, flush=True)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line + "\n")
+
+
+def _last_published_level():
+    published = jma.load_published()
+    return published.get('level') if published else None
+
+
+class Watcher:
+    def __init__(self, interval=DEFAULT_INTERVAL, events_file=EVENTS_FILE):
+        self.interval = interval
+        self.events_file = events_file
+        self.level = _last_published_level()
+        self.fingerprint = None
+        self.precip_date = None
+        self.precip = None
+        self.polls = 0
+        self.revalidated = 0
+
+    def fetch_precip(self, today):
+        """p3d / p30d only move when the day does; fetched once per JST date once they succeed."""
+        if self.precip_date != today:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                f_p3d = pool.submit(jma.get_confirmed_3day_precip)
+                f_p30d = pool.submit(jma.get_30day_precip)
+                p3d, p3d_source = f_p3d.result()
+                p30d, p30d_source = f_p30d.result()
+            self.precip = (p3d, p3d_source, p30d, p30d_source)
+            # A failed fetch is retried on the next poll instead of standing for the whole day
+            self.precip_date = today if p3d is not None and p30d is not None else None
+        return self.precip
+
+    def poll(self):
+        """One poll; returns True if the outputs were republished."""
+        self.polls += 1
+        # Metrics cover one poll; a republish writes them out with the outputs
+        metrics.reset()
+        now = datetime.datetime.now(JST)
+        # Each poll is a run of its own; breaker state carries over between polls
+        fetch_policy.start_run()
+        resp = fetch_policy.get(jma.WARNING_JSON_URL, timeout=10, headers={'Cache-Control': 'no-cache'})
+        new_day = self.precip_date != now.date()
+        if resp.from_cache and not new_day and self.fingerprint is not None:
+            self.revalidated += 1
+            return False
+
+        data = jma.load_warning_document(resp.content.decode('utf-8'), [jma.AREA_CODE_KITAKYUSHU_REGION])
+        advisories = jma.evaluate_advisories(data)
+        fingerprint = advisory_fingerprint(advisories)
+        if fingerprint == self.fingerprint and not new_day:
+            return False
+
+        p3d, p3d_source, p30d, p30d_source = self.fetch_precip(now.date())
+        output = jma.publish(now, p3d, p3d_source, p30d, p30d_source, advisories)
+        self.fingerprint = fingerprint
+        print(f"[{now:%H:%M:%S}] republished: {output['result_text']} (report {advisories[4]})", flush=True)
+        if output['level'] != self.level:
+            emit_event({
+                'type': 'level_change',
+                'at': now.isoformat(timespec='seconds'),
+                'report_time': advisories[4],
+                'from': self.level,
+                'to': output['level'],
+                'result_text': output['result_text'],
+                'p3d': output['p3d'],
+                'p30d': output['p30d'],
+                'is_dry': output['is_dry'],
+                'wind_text': output['wind_text'],
+            }, self.events_file)
+            self.level = output['level']
+        return True
+
+    def run(self, max_polls=None):
+        print(f"Watching {jma.WARNING_JSON_URL} every {self.interval}s", flush=True)
+        while max_polls is None or self.polls < max_polls:
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Poll failed: {e}", flush=True)
+            if max_polls is not None and self.polls >= max_polls:
+                break
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        print(f"{self.polls} polls, {self.revalidated} answered by revalidation", flush=True)
+
+
+def run(interval=DEFAULT_INTERVAL, max_polls=None):
+    sys.stdout.reconfigure(encoding='utf-8')
+    try:
+        Watcher(interval).run(max_polls)
+    except KeyboardInterrupt:
+        pass
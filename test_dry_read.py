@@ -1,6 +1,8 @@
-import requests
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+import jma_client
 import json
-import datetime
 
 # 修正後のコードでテスト
 DRY_AIR_CODE = '21'
@@ -9,9 +11,8 @@ WARNING_JSON_URL = "https://www.jma.go.jp/bosai/warning/data/warning/400000.json
 
 def test_dry_air_read():
     try:
-        url = f"{WARNING_JSON_URL}?_={int(datetime.datetime.now().timestamp())}"
-        print(f"Fetching from: {url}")
-        data = requests.get(url, timeout=10).json()
+        print(f"Fetching from: {WARNING_JSON_URL}")
+        data = jma_client.get_json(WARNING_JSON_URL, timeout=10, headers={'Cache-Control': 'no-cache'})
         
         is_dry = False
         found_area = False